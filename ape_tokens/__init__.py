@@ -26,6 +26,11 @@ def __getattr__(name: str) -> Any:
 
         return tokens
 
+    elif name == "AllowanceManager":
+        from .allowances import AllowanceManager
+
+        return AllowanceManager
+
     elif name == "BalanceManager":
         from .managers import BalanceManager
 
@@ -62,6 +67,7 @@ def __getattr__(name: str) -> Any:
 
 __all__ = [
     "tokens",
+    "AllowanceManager",
     "BalanceManager",
     "ConvertsToToken",
     "Token",
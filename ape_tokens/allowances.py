@@ -0,0 +1,403 @@
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from ape.types import AddressType
+from ape.utils import ManagerAccessMixin, cached_property
+
+from .batch import allowances_of, batch_executor, run_async
+from .managers import _BaseSnapshot, _BaseTokenReaders
+from .types import ConvertsToToken, TokenInstance
+
+if TYPE_CHECKING:
+    from ape.api.address import BaseAddress
+    from silverback import SilverbackBot
+
+# NOTE: Allowances are keyed by (owner, spender)
+AllowanceKey = tuple[AddressType, AddressType]
+
+
+class TokenAllowances(ManagerAccessMixin):
+    """
+    Allowances granted by owners to spenders, for a single token.
+
+    ```{note}
+    Allowances are stored in raw (integer) form, and only converted to Decimal when read.
+    ```
+    """
+
+    def __init__(self, token: TokenInstance):
+        self.token = token
+
+        # NOTE: Only used if live-tracking
+        self._allowances: dict[AllowanceKey, int] = dict()
+        self._owners: set[AddressType] = set()
+        # NOTE: `None` means every spender (of a watched owner) is tracked
+        self._spenders: set[AddressType] | None = set()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} token={self.token.symbol()}>"
+
+    @cached_property
+    def _scale(self) -> Decimal:
+        return Decimal(10 ** self.token.decimals())
+
+    def get(
+        self,
+        owner: "BaseAddress | AddressType | str",
+        spender: "BaseAddress | AddressType | str",
+    ) -> Decimal:
+        """
+        Get the on-chain allowance of ``owner`` for ``spender``.
+
+        NOTE: Does **not** use cached value.
+        """
+
+        owner, spender = (self.conversion_manager.convert(a, AddressType) for a in (owner, spender))
+        return self.token.allowance(owner, spender) / self._scale
+
+    async def aget(
+        self,
+        owner: "BaseAddress | AddressType | str",
+        spender: "BaseAddress | AddressType | str",
+    ) -> Decimal:
+        """Awaitable version of `.get`, which does not block the event loop."""
+
+        # NOTE: Conversion (e.g. ENS) and `decimals` (on first use) may both block on the RPC
+        def prepare() -> tuple[AddressType, AddressType, Decimal]:
+            return (
+                self.conversion_manager.convert(owner, AddressType),
+                self.conversion_manager.convert(spender, AddressType),
+                self._scale,
+            )
+
+        owner_address, spender_address, scale = await run_async(prepare)
+        # NOTE: Batched together with any other concurrent reads (see `BatchExecutor`)
+        return (
+            await batch_executor.acall(self.token.allowance, owner_address, spender_address) / scale
+        )
+
+    def __getitem__(self, key: tuple) -> Decimal:
+        """
+        Get the allowance of ``(owner, spender)``.
+
+        NOTE: Uses cached value, if available.
+        """
+
+        owner, spender = (self.conversion_manager.convert(a, AddressType) for a in key)
+
+        # NOTE: Don't update `self._allowances` (only `.monitor` can)
+        if (raw_allowance := self._allowances.get((owner, spender))) is not None:
+            return raw_allowance / self._scale
+
+        return self.get(owner, spender)
+
+    def _metric_name(self, owner: AddressType, spender: AddressType) -> str:
+        return f"{self.token.symbol()}/{owner}/{spender}"
+
+    def _is_watched(self, owner: AddressType, spender: AddressType) -> bool:
+        return owner in self._owners and (self._spenders is None or spender in self._spenders)
+
+    def _handle_approval(self, log) -> dict[str, Decimal]:
+        # NOTE: Dispatch an Approval log (of a watched owner), if it involves a watched spender
+        if not self._is_watched(log.owner, log.spender):
+            return {}
+
+        if log.removed:
+            # Reorg: an approval overwrites the previous allowance (which the log doesn't have),
+            #        so read it from chain again
+            raw_allowance = self.token.allowance(log.owner, log.spender)
+
+        else:
+            raw_allowance = log.amount
+
+        self._allowances[(log.owner, log.spender)] = raw_allowance
+        # NOTE: Only convert to Decimal when emitting the metric
+        return {self._metric_name(log.owner, log.spender): raw_allowance / self._scale}
+
+    def _install_handler(self, bot: "SilverbackBot", owners: list[AddressType]):
+        from silverback.types import TaskType
+
+        async def allowance_changed(log):
+            if log.removed:
+                return await run_async(self._handle_approval, log)
+
+            return self._handle_approval(log)
+
+        # NOTE: Namespace the function to avoid conflicts, requires globally-unique name
+        allowance_changed.__name__ = f"tokens:{self.token.symbol()}:approvals"
+        bot.broker_task_decorator(
+            TaskType.EVENT_LOG,
+            container=self.token.Approval,
+            # NOTE: A list of values matches any of them, so 1 filter covers every owner
+            filter_args=dict(owner=owners),
+        )(allowance_changed)
+
+
+class AllowanceSnapshot(_BaseSnapshot):
+    """
+    Table of token allowances for a set of owners and spenders, all read at the same block.
+
+    Usage example::
+
+        >>> snapshot = allowances.snapshot(owners, spenders, tokens=["USDC", "DAI"])
+        >>> snapshot["USDC", owner, spender]
+        Decimal('100.5')
+        >>> for token, owner, spender, allowance in snapshot.nonzero():
+        ...     print(token.symbol(), owner, spender, allowance)
+
+    ```{note}
+    Allowances are stored in raw (integer) form, and only converted to Decimal when read.
+    ```
+    """
+
+    def __init__(
+        self,
+        tokens: tuple[TokenInstance, ...],
+        owners: tuple[AddressType, ...],
+        spenders: tuple[AddressType, ...],
+        raw_allowances: dict[AddressType, dict[AllowanceKey, int]],
+        block_id: int,
+    ):
+        super().__init__(tokens, block_id)
+        self.owners = owners
+        self.spenders = spenders
+
+        self._raw_allowances = raw_allowances
+
+    def __repr__(self) -> str:
+        cls_name = self.__class__.__name__
+        return (
+            f"<{cls_name} tokens={len(self.tokens)} owners={len(self.owners)} "
+            f"spenders={len(self.spenders)} block={self.block_id}>"
+        )
+
+    def raw(
+        self,
+        token: ConvertsToToken,
+        owner: "BaseAddress | AddressType | str",
+        spender: "BaseAddress | AddressType | str",
+    ) -> int:
+        """
+        Get the raw (integer) allowance of ``owner`` for ``spender`` of ``token``.
+
+        Raises:
+            KeyError: If the allowance was not able to be read, or is not in the snapshot.
+        """
+
+        token_address = self._get_token(token).address
+        owner = self.conversion_manager.convert(owner, AddressType)
+        spender = self.conversion_manager.convert(spender, AddressType)
+        return self._raw_allowances[token_address][(owner, spender)]
+
+    def __getitem__(self, key) -> Decimal | dict[AllowanceKey, Decimal]:
+        if isinstance(key, tuple):
+            token, owner, spender = key
+            token_instance = self._get_token(token)
+            return self.raw(token_instance, owner, spender) / Decimal(
+                10 ** token_instance.decimals()
+            )
+
+        token_instance = self._get_token(key)
+        scale = Decimal(10 ** token_instance.decimals())
+        return {
+            owner_spender: raw_allowance / scale
+            for owner_spender, raw_allowance in self._raw_allowances.get(
+                token_instance.address, {}
+            ).items()
+        }
+
+    def nonzero(self) -> Iterator[tuple[TokenInstance, AddressType, AddressType, Decimal]]:
+        """Iterate over every non-zero allowance, as ``(token, owner, spender, allowance)``."""
+
+        for token in self.tokens:
+            raw_allowances = self._raw_allowances.get(token.address, {})
+            if not (nonzero := {k: v for k, v in raw_allowances.items() if v > 0}):
+                continue
+
+            scale = Decimal(10 ** token.decimals())
+            for (owner, spender), raw_allowance in nonzero.items():
+                yield token, owner, spender, raw_allowance / scale
+
+
+class AllowanceManager(_BaseTokenReaders[TokenAllowances]):
+    """
+    Fetch token allowances in Decimal format for a given set of tokens.
+
+    ```{note}
+    This class is capable of maintaining an in-memory allowance cache, using Silverback.
+    ```
+
+    Usage example::
+
+        >>> from ape_tokens import AllowanceManager
+        >>>
+        >>> allowances = AllowanceManager("USDC", "DAI")
+        >>> allowances["USDC"][owner, router]
+        Decimal('100')
+        >>> # NOTE: Every token x owner x spender, using batched multicalls
+        >>> snapshot = allowances.snapshot(owners, spenders)
+
+    Usage with Silverback::
+
+        >>> from ape_tokens import AllowanceManager
+        >>> from silverback import SilverbackBot
+        >>>
+        >>> bot = SilverbackBot()
+        >>> allowances = AllowanceManager("USDC", "DAI")
+        >>> # Watch allowances of `bot.signer` (if configured) and other owners
+        >>> allowances.monitor(bot, *owners, spenders=[router])
+    """
+
+    _reader_cls = TokenAllowances
+
+    def get_allowance(
+        self,
+        token: ConvertsToToken,
+        owner: "BaseAddress | AddressType | str",
+        spender: "BaseAddress | AddressType | str",
+    ) -> Decimal:
+        return self[token][owner, spender]
+
+    async def aget_allowance(
+        self,
+        token: ConvertsToToken,
+        owner: "BaseAddress | AddressType | str",
+        spender: "BaseAddress | AddressType | str",
+    ) -> Decimal:
+        """Awaitable version of `.get_allowance`, which does not block the event loop."""
+        return await run_async(self.get_allowance, token, owner, spender)
+
+    def snapshot(
+        self,
+        owners: Iterable["BaseAddress | AddressType | str"],
+        spenders: Iterable["BaseAddress | AddressType | str"],
+        tokens: Iterable[ConvertsToToken] | None = None,
+        block_id: int | None = None,
+    ) -> AllowanceSnapshot:
+        """
+        Get on-chain allowances of many tokens for many owners and spenders, all at the same block.
+
+        ```{note}
+        Uses batched multicalls, instead of one ``allowance`` call per token per owner per
+        spender.
+        ```
+
+        Args:
+            owners: The accounts that granted the allowances.
+            spenders: The accounts that the allowances were granted to.
+            tokens: The tokens to get the allowances of, by address, symbol, or contract instance.
+                Defaults to all tokens configured in this manager.
+            block_id: The block to get the allowances at. Defaults to the current head.
+
+        Returns:
+            :class:`~ape_tokens.allowances.AllowanceSnapshot`
+        """
+
+        if block_id is None:
+            block_id = self.chain_manager.blocks.height
+
+        token_instances = self._snapshot_tokens(tokens)
+        owner_addresses = tuple(self.conversion_manager.convert(a, AddressType) for a in owners)
+        spender_addresses = tuple(self.conversion_manager.convert(a, AddressType) for a in spenders)
+
+        return AllowanceSnapshot(
+            token_instances,
+            owner_addresses,
+            spender_addresses,
+            allowances_of(token_instances, owner_addresses, spender_addresses, block_id=block_id),
+            block_id,
+        )
+
+    async def asnapshot(
+        self,
+        owners: Iterable["BaseAddress | AddressType | str"],
+        spenders: Iterable["BaseAddress | AddressType | str"],
+        tokens: Iterable[ConvertsToToken] | None = None,
+        block_id: int | None = None,
+    ) -> AllowanceSnapshot:
+        """Awaitable version of `.snapshot`, which does not block the event loop."""
+        return await run_async(self.snapshot, owners, spenders, tokens=tokens, block_id=block_id)
+
+    def monitor(
+        self,
+        bot: "SilverbackBot",
+        *owners: "BaseAddress | AddressType | str",
+        spenders: Iterable["BaseAddress | AddressType | str"] | None = None,
+    ):
+        """
+        Install the allowance monitor on a Silverback bot, for all configured tokens.
+
+        On startup, the allowances of every owner for every spender are loaded (using batched
+        multicalls), and are then kept up to date from Approval logs, using 1 subscription per
+        token (filtered by all owners at once), dispatched locally by spender.
+
+        The monitor publishes metrics in the format "{symbol}/{owner}/{spender}", which can be
+        used with Silverback's `@bot.on_metric(...)` decorator to trigger alerts.
+
+        Args:
+            bot: The `silverback.SilverbackBot` instance to install monitoring on.
+            *owners: Other accounts to watch the allowances of. Includes `bot.signer`. (if one is
+              configured)
+            spenders: The spenders to watch the allowances for. Defaults to every spender, in
+              which case nothing is loaded on startup (allowances are only tracked from Approval
+              logs, once they happen).
+
+        ```{important}
+        Some ERC20 implementations (e.g. OpenZeppelin 5.x) do not emit an Approval log when an
+        allowance is spent by ``transferFrom``, so tracked allowances may be higher than the
+        on-chain value until the next approval. Use `.snapshot` to get exact values.
+        ```
+        """
+
+        if not (owner_addresses := self._watched_addresses(bot, owners)):
+            raise ValueError(
+                "Must either provide a set of owners to watch, or enable `bot.signer`."
+            )
+
+        spender_addresses = (
+            None
+            if spenders is None
+            else [self.conversion_manager.convert(a, AddressType) for a in spenders]
+        )
+
+        from silverback.types import TaskType
+
+        self._store_all()
+
+        for token_allowances in self._readers.values():
+            token_allowances._owners.update(owner_addresses)
+
+            if spender_addresses is None:
+                token_allowances._spenders = None
+
+            elif token_allowances._spenders is not None:
+                token_allowances._spenders.update(spender_addresses)
+
+            token_allowances._install_handler(bot, owner_addresses)
+
+        if spender_addresses is None:
+            return  # NOTE: Spenders are unknown, so there is nothing to load
+
+        # Startup task: Load current allowances of all tokens for all owners and spenders at once
+        async def load_allowances(_):
+            await run_async(
+                _load_allowances, self._readers.values(), owner_addresses, spender_addresses
+            )
+
+        # NOTE: Namespace the function to avoid conflicts
+        load_allowances.__name__ = "tokens:load-allowances"
+        bot.broker_task_decorator(TaskType.STARTUP)(load_allowances)
+
+
+def _load_allowances(
+    token_allowances: Iterable[TokenAllowances],
+    owners: list[AddressType],
+    spenders: list[AddressType],
+):
+    # NOTE: All `allowance` calls are batched together, and made at the same block
+    token_allowances = list(token_allowances)
+    raw_allowances = allowances_of((ta.token for ta in token_allowances), owners, spenders)
+
+    for ta in token_allowances:
+        ta._allowances.update(raw_allowances.get(ta.token.address, {}))
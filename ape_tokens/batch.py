@@ -0,0 +1,320 @@
+import asyncio
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from threading import Lock, Timer
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+from weakref import WeakKeyDictionary
+
+from ape.exceptions import APINotImplementedError, ContractLogicError, ContractNotFoundError
+from ape.logging import get_logger
+from ape.utils import ManagerAccessMixin
+
+from .cache import _is_live_network
+
+if TYPE_CHECKING:
+    from ape.contracts.base import ContractCallHandler
+    from ape.types import AddressType
+    from ape_ethereum.multicall import Call
+
+    from .types import TokenInstance
+
+logger = get_logger(__package__)
+
+# NOTE: Keeps each `eth_call` well under typical RPC response size and gas limits
+DEFAULT_BATCH_SIZE = 250
+
+PendingCall = tuple["ContractCallHandler", tuple[Any, ...]]
+
+T = TypeVar("T")
+
+# NOTE: Semaphores are bound to an event loop, so keep one per loop
+_semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+
+async def run_async(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking (I/O) function in a worker thread, without blocking the event loop.
+
+    ```{note}
+    At most ``provider.concurrency`` calls are in flight at once (per event loop), so bursts of
+    requests queue up instead of overwhelming the RPC.
+    ```
+    """
+
+    loop = asyncio.get_running_loop()
+    if (semaphore := _semaphores.get(loop)) is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(ManagerAccessMixin.provider.concurrency)
+
+    async with semaphore:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+# NOTE: Whether Multicall3 is available (or was injected), by chain ID. Only kept for live
+#       networks, since local and fork networks can be reverted to before an injection.
+_multicall_available: dict[int, bool] = dict()
+
+
+def _new_multicall() -> "Call | None":
+    from ape_ethereum import multicall
+    from ape_ethereum.multicall.exceptions import UnsupportedChainError
+
+    chain_id = ManagerAccessMixin.provider.chain_id
+    if (available := _multicall_available.get(chain_id)) is not None:
+        return multicall.Call() if available else None
+
+    call: Call | None = multicall.Call()
+
+    try:
+        call.contract  # type: ignore[union-attr]  # NOTE: Raises if Multicall3 is not available
+
+    except UnsupportedChainError:
+        try:
+            # NOTE: Only works for providers that support `set_code` (e.g. local and fork networks)
+            multicall.Call.inject()
+            call = multicall.Call()
+
+        except APINotImplementedError:
+            call = None  # NOTE: Multicall3 is not available
+
+    if _is_live_network():
+        _multicall_available[chain_id] = call is not None
+
+    return call
+
+
+def batch_call(
+    calls: Sequence[PendingCall],
+    block_id: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int | None = None,
+) -> list[Any]:
+    """
+    Perform many view calls using Multicall3, in batches of (at most) ``batch_size`` calls.
+
+    Batches are executed concurrently, and all of them are executed against the same block
+    (``block_id``, or the chain head at the time this function is called), so the results are
+    consistent with each other. The head is only looked up when the calls do not fit in a single
+    request. If Multicall3 is not available on the chain (and cannot be injected), the calls are
+    made individually instead (still concurrently).
+
+    Args:
+        calls: Sequence of ``(method, args)`` pairs to call, e.g. ``(token.balanceOf, (owner,))``.
+        block_id: The block number to perform every call at. Defaults to the current head.
+        batch_size: The maximum number of calls to pack into a single multicall.
+        max_workers: The maximum number of batches in flight at once.
+            Defaults to the provider's ``concurrency`` setting.
+
+    Returns:
+        list[Any]: The decoded result of each call, in the same order as ``calls``.
+        Failed calls produce ``None``.
+    """
+
+    if len(calls) == 0:
+        return []
+
+    call_kwargs: dict[str, Any] = {} if block_id is None else dict(block_id=block_id)
+
+    def execute_one(pending_call: PendingCall) -> Any:
+        method, args = pending_call
+        try:
+            return method(*args, **call_kwargs)
+        except (ContractLogicError, ContractNotFoundError):
+            return None  # NOTE: Same as a failed call in a multicall
+
+    if len(calls) == 1:  # NOTE: Just call directly if only 1
+        return [execute_one(calls[0])]
+
+    # NOTE: Make sure Multicall3 is available *before* spawning batches
+    multicall_available = _new_multicall() is not None
+    batches = [calls[idx : idx + batch_size] for idx in range(0, len(calls), batch_size)]
+
+    def execute(batch: Sequence[PendingCall]) -> list[Any]:
+        call = cast("Call", _new_multicall())
+
+        for method, args in batch:
+            call.add(method, *args)
+
+        return list(call(**call_kwargs))
+
+    if multicall_available and len(batches) == 1:
+        return execute(batches[0])  # NOTE: A single `eth_call` is already consistent
+
+    # NOTE: Only pin the head when the calls are spread over multiple requests
+    if block_id is None:
+        call_kwargs["block_id"] = ManagerAccessMixin.chain_manager.blocks.height
+
+    if max_workers is None:
+        max_workers = ManagerAccessMixin.provider.concurrency
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        if not multicall_available:
+            logger.debug("Multicall3 not available, falling back to individual calls.")
+            return list(pool.map(execute_one, calls))
+
+        return list(chain.from_iterable(pool.map(execute, batches)))
+
+
+def balances_of(
+    tokens: Iterable["TokenInstance"],
+    accounts: Sequence["AddressType"],
+    block_id: int | None = None,
+    **batch_kwargs,
+) -> dict["AddressType", dict["AddressType", int]]:
+    """
+    Get the raw ``balanceOf`` of every account for every token, all at the same block.
+
+    Returns:
+        dict[AddressType, dict[AddressType, int]]: Raw balances, keyed by token then account.
+        Balances that could not be fetched are omitted.
+    """
+
+    pairs = [(token, account) for token in tokens for account in accounts]
+    results = batch_call(
+        [(token.balanceOf, (account,)) for token, account in pairs],
+        block_id=block_id,
+        **batch_kwargs,
+    )
+
+    balances: dict[AddressType, dict[AddressType, int]] = dict()
+    for (token, account), raw_balance in zip(pairs, results, strict=True):
+        if isinstance(raw_balance, int):
+            balances.setdefault(token.address, dict())[account] = raw_balance
+
+    return balances
+
+
+def allowances_of(
+    tokens: Iterable["TokenInstance"],
+    owners: Sequence["AddressType"],
+    spenders: Sequence["AddressType"],
+    block_id: int | None = None,
+    **batch_kwargs,
+) -> dict["AddressType", dict[tuple["AddressType", "AddressType"], int]]:
+    """
+    Get the raw ``allowance`` of every owner for every spender for every token, all at the same
+    block.
+
+    Returns:
+        dict[AddressType, dict[tuple[AddressType, AddressType], int]]: Raw allowances, keyed by
+        token then ``(owner, spender)``. Allowances that could not be fetched are omitted.
+    """
+
+    triples = [
+        (token, owner, spender) for token in tokens for owner in owners for spender in spenders
+    ]
+    results = batch_call(
+        [(token.allowance, (owner, spender)) for token, owner, spender in triples],
+        block_id=block_id,
+        **batch_kwargs,
+    )
+
+    allowances: dict[AddressType, dict[tuple[AddressType, AddressType], int]] = dict()
+    for (token, owner, spender), raw_allowance in zip(triples, results, strict=True):
+        if isinstance(raw_allowance, int):
+            allowances.setdefault(token.address, dict())[(owner, spender)] = raw_allowance
+
+    return allowances
+
+
+class BatchExecutor:
+    """
+    Collects view calls from any caller (or thread), and executes them together using
+    :func:`~ape_tokens.batch.batch_call`.
+
+    Pending calls are executed once ``max_batch_size`` of them are waiting, or ``max_delay``
+    seconds after the first of them was submitted (whichever comes first). Only worth it for
+    concurrent callers (e.g. ``asyncio.gather`` of many reads), since every call waits for the
+    rest of its batch.
+
+    Usage example::
+
+        >>> from ape_tokens.batch import batch_executor
+        >>> futures = [batch_executor.submit(token.balanceOf, account) for token in tokens]
+        >>> balances = [future.result() for future in futures]
+
+    ```{note}
+    Every call in a batch is made against the same block (the chain head when the batch is
+    executed). Calls that fail raise `ContractLogicError` from their future.
+    ```
+    """
+
+    def __init__(self, max_batch_size: int = DEFAULT_BATCH_SIZE, max_delay: float = 0.005):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._pending: list[tuple[PendingCall, Future]] = []
+        self._timer: Timer | None = None
+        self._lock = Lock()
+        self._pool = ThreadPoolExecutor(thread_name_prefix="ape-tokens-batch")
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, method: "ContractCallHandler", *args: Any) -> Future:
+        """Queue a view call (e.g. ``token.balanceOf, account``), and get a future of its result."""
+
+        future: Future = Future()
+
+        with self._lock:
+            self._pending.append(((method, args), future))
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+
+            elif self._timer is None:
+                self._timer = Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return future
+
+    def call(self, method: "ContractCallHandler", *args: Any) -> Any:
+        """Queue a view call, and wait for its result."""
+        return self.submit(method, *args).result()
+
+    async def acall(self, method: "ContractCallHandler", *args: Any) -> Any:
+        """Queue a view call, and await its result (without blocking the event loop)."""
+        return await asyncio.wrap_future(self.submit(method, *args))
+
+    def flush(self):
+        """Execute all pending calls now."""
+
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        # NOTE: Must be called with `self._lock` held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._pending:
+            self._pool.submit(self._execute, self._pending)
+            self._pending = []
+
+    def _execute(self, batch: list[tuple[PendingCall, Future]]):
+        try:
+            results = batch_call([pending_call for pending_call, _ in batch])
+
+        except Exception as err:
+            for _, future in batch:
+                future.set_exception(err)
+
+            return
+
+        for ((method, _), future), result in zip(batch, results, strict=True):
+            if result is None:  # NOTE: Call reverted
+                future.set_exception(
+                    ContractLogicError(
+                        f"Call to '{method.abis[0].name}' failed.",
+                        contract_address=method.contract.address,
+                    )
+                )
+
+            else:
+                future.set_result(result)
+
+
+# NOTE: Shared by all awaitable token reads, so concurrent callers are batched together
+batch_executor = BatchExecutor()
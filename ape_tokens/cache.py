@@ -0,0 +1,340 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+from ape.exceptions import ProviderNotConnectedError
+from ape.utils import ManagerAccessMixin, cached_property
+
+if TYPE_CHECKING:
+    from ape.types import AddressType
+
+    from .types import TokenInstance
+
+
+def _is_live_network() -> bool:
+    try:
+        return not ManagerAccessMixin.provider.network.is_dev
+
+    except ProviderNotConnectedError:
+        return False
+
+
+# NOTE: These are the only fields that are safe to cache forever (see `ImmutableCallHandler`)
+METADATA_FIELDS = ("name", "symbol", "decimals")
+
+
+class TokenMetadataCache(ManagerAccessMixin):
+    """
+    Persistent (SQLite) store of immutable token metadata, keyed by ``(chain_id, address)``.
+
+    ```{note}
+    Only used on live networks, since contract addresses on local and fork networks are
+    re-used by unrelated contracts between sessions.
+    ```
+    """
+
+    def __init__(self, path: Path | None = None):
+        self._path = path
+        self._lock = Lock()
+
+    @cached_property
+    def path(self) -> Path:
+        return self._path or self.config_manager.DATA_FOLDER / "tokens" / "metadata.db"
+
+    @cached_property
+    def _connection(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # NOTE: Calls may come from multiple threads (e.g. batched loads), see `self._lock`
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "chain_id INTEGER NOT NULL, "
+            "address TEXT NOT NULL, "
+            "name TEXT, "
+            "symbol TEXT, "
+            "decimals INTEGER, "
+            "PRIMARY KEY (chain_id, address))"
+        )
+        connection.commit()
+        return connection
+
+    @property
+    def enabled(self) -> bool:
+        return _is_live_network()
+
+    def get(self, chain_id: int, address: str) -> dict[str, Any]:
+        """Get all cached metadata fields for a token (missing fields are not included)."""
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT name, symbol, decimals FROM metadata WHERE chain_id = ? AND address = ?",
+                (chain_id, address),
+            ).fetchone()
+
+        if row is None:
+            return {}
+
+        return {
+            field: value
+            for field, value in zip(METADATA_FIELDS, row, strict=True)
+            if value is not None
+        }
+
+    def set(self, chain_id: int, address: str, field: str, value: Any):
+        """Record a single metadata field for a token."""
+
+        if field not in METADATA_FIELDS:
+            raise ValueError(f"'{field}' is not a cacheable metadata field")
+
+        with self._lock:
+            # NOTE: `field` is safe to format into the query, since it is checked above
+            self._connection.execute(
+                f"INSERT INTO metadata (chain_id, address, {field}) VALUES (?, ?, ?) "  # noqa: S608
+                f"ON CONFLICT (chain_id, address) DO UPDATE SET {field} = excluded.{field}",
+                (chain_id, address, value),
+            )
+            self._connection.commit()
+
+
+class TokenInstanceCache(ManagerAccessMixin):
+    """
+    Bounded (LRU) cache of interned token instances, keyed by ``(chain_id, address)``.
+
+    ```{note}
+    The cache is cleared automatically whenever the connected network changes. It is only used
+    on live networks, since local and fork networks can be reverted (e.g. between tests), which
+    re-uses the addresses of tokens that no longer exist.
+    ```
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+
+        self._instances: OrderedDict[tuple[int, AddressType], TokenInstance] = OrderedDict()
+        self._network_choice: str | None = None
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def _get_chain_id(self) -> int:
+        # NOTE: Must be called with `self._lock` held
+        provider = self.provider
+        if (network_choice := provider.network_choice) != self._network_choice:
+            self._instances.clear()
+            self._network_choice = network_choice
+
+        return provider.network.chain_id
+
+    @property
+    def enabled(self) -> bool:
+        return _is_live_network()
+
+    def get(self, address: "AddressType") -> "TokenInstance | None":
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            key = (self._get_chain_id(), address)
+
+            if (instance := self._instances.get(key)) is not None:
+                self._instances.move_to_end(key)
+
+            return instance
+
+    def put(self, instance: "TokenInstance"):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            key = (self._get_chain_id(), instance.address)
+            self._instances[key] = instance
+            self._instances.move_to_end(key)
+
+            while len(self._instances) > self.maxsize:
+                self._instances.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._instances.clear()
+
+
+class LookupMissCache:
+    """
+    Bounded (LRU) cache of values that failed to resolve to a token, which expire after ``ttl``.
+
+    Each miss is recorded under a ``generation`` (e.g. the chain and installed tokenlists), and
+    the whole cache is cleared whenever the generation changes, since a value that failed to
+    resolve before might resolve now.
+
+    ```{note}
+    Kept separate from :class:`~ape_tokens.cache.TokenInstanceCache`, so that lookups of many
+    arbitrary strings can never evict resolved tokens.
+    ```
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        # NOTE: Value -> expiry (in terms of `time.monotonic`)
+        self._misses: OrderedDict[str, float] = OrderedDict()
+        self._generation: Any = None
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._misses)
+
+    def _check_generation(self, generation: Any):
+        # NOTE: Must be called with `self._lock` held
+        if generation != self._generation:
+            self._misses.clear()
+            self._generation = generation
+
+    def is_miss(self, value: str, generation: Any) -> bool:
+        """Whether ``value`` is known to not resolve to a token (as of ``generation``)."""
+
+        with self._lock:
+            self._check_generation(generation)
+
+            if (expiry := self._misses.get(value)) is None:
+                return False
+
+            elif expiry <= time.monotonic():
+                del self._misses[value]
+                return False
+
+            self._misses.move_to_end(value)
+            return True
+
+    def add(self, value: str, generation: Any):
+        """Record that ``value`` did not resolve to a token (as of ``generation``)."""
+
+        with self._lock:
+            self._check_generation(generation)
+            self._misses[value] = time.monotonic() + self.ttl
+            self._misses.move_to_end(value)
+
+            while len(self._misses) > self.maxsize:
+                self._misses.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._misses.clear()
+
+
+class BalanceCheckpointStore(ManagerAccessMixin):
+    """
+    Persistent (SQLite) store of monitored balances, keyed by ``(chain_id, token, account)``.
+
+    Each balance is stored in raw (integer) form, along with the block that it is accurate as of.
+
+    ```{note}
+    The block is stored per account (not per token), since the store is shared by every bot and
+    the accounts that are watched may change, so an account may be checkpointed as of a much
+    earlier block than the rest.
+    ```
+
+    ```{note}
+    Only used on live networks, since local and fork networks do not persist between sessions.
+    ```
+    """
+
+    def __init__(self, path: Path | None = None):
+        self._path = path
+        self._lock = Lock()
+
+    @cached_property
+    def path(self) -> Path:
+        return self._path or self.config_manager.DATA_FOLDER / "tokens" / "balances.db"
+
+    @cached_property
+    def _connection(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # NOTE: Calls may come from multiple threads (e.g. bot tasks), see `self._lock`
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        # NOTE: `raw_balance` is TEXT, since uint256 values do not fit in an SQLite INTEGER
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS account_checkpoints ("
+            "chain_id INTEGER NOT NULL, "
+            "token TEXT NOT NULL, "
+            "account TEXT NOT NULL, "
+            "block_number INTEGER NOT NULL, "
+            "raw_balance TEXT NOT NULL, "
+            "PRIMARY KEY (chain_id, token, account))"
+        )
+        connection.commit()
+        return connection
+
+    @property
+    def enabled(self) -> bool:
+        return _is_live_network()
+
+    def get(self, chain_id: int, token: str) -> dict[str, tuple[int, int]]:
+        """
+        Get the checkpoint of every account of a token.
+
+        Returns:
+            dict[str, tuple[int, int]]: The block number and raw balance as of it (by account).
+            Accounts that were never checkpointed are omitted.
+        """
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT account, block_number, raw_balance FROM account_checkpoints "
+                "WHERE chain_id = ? AND token = ?",
+                (chain_id, token),
+            ).fetchall()
+
+        return {
+            account: (block_number, int(raw_balance)) for account, block_number, raw_balance in rows
+        }
+
+    def save(
+        self,
+        chain_id: int,
+        block_number: int,
+        accounts: Iterable[tuple[str, str]],
+        balances: Iterable[tuple[str, str, int]],
+    ):
+        """
+        Checkpoint the ``(token, account)`` pairs of ``accounts`` as of ``block_number``,
+        recording the ``(token, account, raw_balance)`` balances that changed since their last
+        checkpoint.
+        """
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO account_checkpoints "
+                "(chain_id, token, account, block_number, raw_balance) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (chain_id, token, account) DO UPDATE SET "
+                "block_number = excluded.block_number, raw_balance = excluded.raw_balance",
+                (
+                    (chain_id, token, account, block_number, str(raw_balance))
+                    for token, account, raw_balance in balances
+                ),
+            )
+            # NOTE: Unchanged balances are still accurate as of the new checkpoint
+            self._connection.executemany(
+                "UPDATE account_checkpoints SET block_number = ? "
+                "WHERE chain_id = ? AND token = ? AND account = ? AND block_number < ?",
+                (
+                    (block_number, chain_id, token, account, block_number)
+                    for token, account in accounts
+                ),
+            )
+            # NOTE: Both in 1 transaction, so balances always match their checkpoint block
+            self._connection.commit()
+
+
+# NOTE: Just need one singleton of each
+metadata_cache = TokenMetadataCache()
+instance_cache = TokenInstanceCache()
+lookup_misses = LookupMissCache()
+balance_checkpoints = BalanceCheckpointStore()
@@ -13,6 +13,15 @@ class ListInfo(BaseModel):
 
 class TokensConfig(PluginConfig):
     default: str | None = None
+    # NOTE: Tokenlists to source tokens from, highest priority first (instead of just `default`)
+    priority: list[str] = []
     required: list[ListInfo] = []
+    # NOTE: Seconds until a local copy of a required list is downloaded again (`None` = never)
+    refresh_interval: int | None = None
+    # NOTE: Tokenlist tokens are built straight from the ERC20 ABI (no network I/O) unless enabled,
+    #       and proxies are only resolved when a non-ERC20 attribute is accessed
+    detect_proxy: bool = False
+    # NOTE: Blocks until a monitored balance change is considered final (and can't be reorged)
+    finality_depth: int = 64
 
     model_config = SettingsConfigDict(env_prefix="APE_TOKENS_")
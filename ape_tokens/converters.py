@@ -1,5 +1,5 @@
-from collections.abc import Iterator
-from decimal import Decimal
+from collections.abc import Iterable
+from decimal import Decimal, InvalidOperation
 from typing import Any
 
 from ape.api import ConverterAPI
@@ -7,17 +7,21 @@ from ape.exceptions import ConversionError, ProviderNotConnectedError
 from ape.logging import logger
 from ape.types import AddressType
 from ape.utils import cached_property
-from tokenlists import TokenInfo, TokenListManager
+
+from .index import IndexedTokenListManager, TokenIndex, TokenRecord
 
 
 class _BaseTokenConverter(ConverterAPI):
     _did_warn_no_lists_installed = False
 
     @cached_property
-    def manager(self) -> TokenListManager:
-        return TokenListManager()
+    def manager(self) -> IndexedTokenListManager:
+        manager = IndexedTokenListManager()
+        # NOTE: Resolve symbols the same way as `TokenManager`
+        manager.priority = list(self.config_manager.get_config("tokens").priority)
+        return manager
 
-    def get_tokens(self) -> Iterator[TokenInfo]:
+    def get_index(self) -> TokenIndex:
         try:
             provider = self.provider
         except ProviderNotConnectedError as e:
@@ -26,40 +30,150 @@ class _BaseTokenConverter(ConverterAPI):
             ) from e
 
         try:
-            return self.manager.get_tokens(chain_id=provider.network.chain_id)
+            return self.manager.get_index(provider.network.chain_id)
         except ValueError as err:
             if not self._did_warn_no_lists_installed:
                 logger.warn_from_exception(err, "There are no token lists installed")
                 self._did_warn_no_lists_installed = True
 
-            return iter([])
+            return TokenIndex([])
+
+
+# NOTE: Token decimals are a uint8, so every possible scale is computed up front
+_SCALES = tuple(10**decimals for decimals in range(256))
+
+
+def parse_amount(amount: str, decimals: int) -> int:
+    """
+    Parse a decimal ``amount`` (e.g. ``"123.45"``) into its raw (integer) value.
+
+    ```{note}
+    Plain decimal strings are parsed with integer arithmetic only. Anything else (e.g.
+    ``"1e6"``) is parsed by `Decimal` instead.
+    ```
+
+    Raises:
+        ConversionError: If ``amount`` is not a number, or has more fractional digits than
+          ``decimals``.
+    """
+
+    whole, _, fraction = amount.partition(".")
+    sign = -1 if whole.startswith("-") else 1
+    if whole[:1] in ("-", "+"):
+        whole = whole[1:]
+
+    if (
+        (whole or fraction)
+        and (not whole or (whole.isascii() and whole.isdigit()))
+        and (not fraction or (fraction.isascii() and fraction.isdigit()))
+    ):
+        # NOTE: Trailing zeros don't change the value, so they don't count towards `decimals`
+        if len(fraction := fraction.rstrip("0")) > decimals:
+            raise ConversionError(f"Amount '{amount}' has more than {decimals} decimals.")
+
+        return sign * (
+            int(whole or 0) * _SCALES[decimals] + int(fraction.ljust(decimals, "0") or 0)
+        )
+
+    try:
+        raw_amount = Decimal(amount).scaleb(decimals)
+
+    except InvalidOperation as err:
+        raise ConversionError(f"Invalid amount '{amount}'.") from err
+
+    if not raw_amount.is_finite():
+        raise ConversionError(f"Invalid amount '{amount}'.")
+
+    elif raw_amount != raw_amount.to_integral_value():
+        raise ConversionError(f"Amount '{amount}' has more than {decimals} decimals.")
+
+    return int(raw_amount)
 
 
 class TokenAmountConverter(_BaseTokenConverter):
     """Converts token amounts like `100 LINK` to 1e18"""
 
+    # NOTE: The last value found to be convertible (see `is_convertible`), since `convert` is
+    #       called with the same value right after
+    _last_convertible: tuple[str, TokenIndex, str, TokenRecord] | None = None
+
+    @staticmethod
+    def _split(value: str) -> tuple[str, str] | None:
+        amount, _, symbol = value.partition(" ")
+        if not amount or not symbol or " " in symbol:
+            return None
+
+        return amount, symbol
+
     def is_convertible(self, value: Any) -> bool:
-        if not isinstance(value, str):
+        if not isinstance(value, str) or not (parts := self._split(value)):
             return False
 
-        if " " not in value or len(value.split(" ")) > 2:
+        amount, symbol = parts
+        if symbol not in (index := self.get_index()):
             return False
 
-        _, symbol = value.split(" ")
+        try:
+            self._last_convertible = (value, index, amount, index.get_record(symbol))
 
-        token_map = map(lambda t: t.symbol, self.get_tokens())
+        except ValueError:
+            pass  # NOTE: Ambiguous symbol, so `convert` raises
 
-        return symbol in token_map
+        return True
+
+    def _get_record(self, symbol: str, index: TokenIndex) -> TokenRecord:
+        try:
+            return index.get_record(symbol)
+
+        except ValueError as err:
+            raise ConversionError(str(err)) from err
 
     def convert(self, value: str) -> int:
-        value, symbol = value.split(" ")
+        index = self.get_index()
+        if (
+            (last_convertible := self._last_convertible)
+            and last_convertible[0] == value
+            # NOTE: Index changes with the network (and tokenlists)
+            and last_convertible[1] is index
+        ):
+            _, _, amount, record = last_convertible
+
+        elif parts := self._split(value):
+            amount, symbol = parts
+            record = self._get_record(symbol, index)
+
+        else:
+            raise ConversionError(f"Invalid token amount '{value}'.")
+
+        return parse_amount(amount, record.decimals)
 
-        provider = self.network_manager.active_provider
-        assert provider  # Really just to help mypy
+    def convert_many(self, values: Iterable[str]) -> list[int]:
+        """
+        Convert many token amounts at once, e.g. ``["1.5 LINK", "100 USDC"]``.
 
-        token = self.manager.get_token_info(symbol, chain_id=provider.network.chain_id)
+        ```{note}
+        The tokenlist index is only looked up once, and each symbol is only resolved once.
+        ```
 
-        return int(Decimal(value) * 10**token.decimals)
+        Raises:
+            ConversionError: If any of the values can not be converted.
+        """
+
+        index = self.get_index()
+        records: dict[str, TokenRecord] = dict()
+        raw_amounts = []
+
+        for value in values:
+            if not (parts := self._split(value)):
+                raise ConversionError(f"Invalid token amount '{value}'.")
+
+            amount, symbol = parts
+            if (record := records.get(symbol)) is None:
+                record = records[symbol] = self._get_record(symbol, index)
+
+            raw_amounts.append(parse_amount(amount, record.decimals))
+
+        return raw_amounts
 
 
 class TokenSymbolConverter(_BaseTokenConverter):
@@ -69,11 +183,12 @@ class TokenSymbolConverter(_BaseTokenConverter):
         if not isinstance(value, str):
             return False
 
-        token_map = map(lambda t: t.symbol, self.get_tokens())
-
-        return value in token_map
+        return value in self.get_index()
 
     def convert(self, symbol: str) -> AddressType:
-        token = self.manager.get_token_info(symbol, chain_id=self.provider.network.chain_id)
+        try:
+            token = self.get_index().get_record(symbol)
+        except ValueError as err:
+            raise ConversionError(str(err)) from err
 
-        return AddressType(token.address)  # type: ignore[arg-type]
+        return token.address
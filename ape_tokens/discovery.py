@@ -0,0 +1,118 @@
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
+from ape.contracts import ContractInstance
+from ape.logging import get_logger
+from ape.types import AddressType
+from ape.utils import ManagerAccessMixin
+from tokenlists import TokenInfo
+
+from .batch import DEFAULT_BATCH_SIZE, batch_call
+from .history import iter_transfer_logs
+from .types import ERC20, TokenInstance
+
+if TYPE_CHECKING:
+    from ape.api.address import BaseAddress
+
+logger = get_logger(__package__)
+
+
+def _to_text(value) -> str | None:
+    # NOTE: Some older tokens (e.g. MKR) return `bytes32` instead of `string`
+    if isinstance(value, bytes):
+        return value.rstrip(b"\x00").decode("utf-8", errors="replace")
+
+    return value
+
+
+def resolve_tokens(addresses: Iterable[AddressType]) -> list[TokenInstance]:
+    """
+    Read the metadata of many (unknown) contracts using batched multicalls, and create token
+    instances for the ones that behave like ERC20 tokens.
+
+    ```{note}
+    Contracts without ``decimals`` (e.g. EOAs, or ERC721 collections) are skipped.
+    ```
+    """
+
+    contracts = [ContractInstance(address, contract_type=ERC20) for address in addresses]
+    results = iter(
+        batch_call(
+            [
+                (method, ())
+                for contract in contracts
+                for method in (contract.decimals, contract.symbol, contract.name)
+            ]
+        )
+    )
+
+    chain_id = ManagerAccessMixin.provider.chain_id
+    tokens = []
+    for contract in contracts:
+        decimals, symbol, name = next(results), next(results), next(results)
+
+        if not isinstance(decimals, int):
+            logger.debug(f"Skipping {contract.address}, which has no `decimals`.")
+            continue
+
+        # NOTE: Not validated, since it is only used to seed the metadata of the instance
+        token_info = TokenInfo.model_construct(
+            chainId=chain_id,
+            address=contract.address,
+            name=_to_text(name) or "",
+            symbol=_to_text(symbol) or "",
+            decimals=decimals,
+        )
+        tokens.append(TokenInstance.from_tokeninfo(token_info, detect_proxy=False))
+
+    return tokens
+
+
+def iter_discovered_tokens(
+    accounts: Iterable["BaseAddress | AddressType | str"],
+    start_block: int = 0,
+    stop_block: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    **page_kwargs,
+) -> Iterator[TokenInstance]:
+    """
+    Stream the tokens that ``accounts`` sent or received between ``start_block`` and
+    ``stop_block``, found from their Transfer logs.
+
+    Each contract is only resolved once (the first time it is seen), and contracts are resolved
+    in batches of ``batch_size`` (see :func:`~ape_tokens.discovery.resolve_tokens`).
+
+    Args:
+        accounts: The accounts to discover the tokens of.
+        start_block: The first block to search. Defaults to ``0``.
+        stop_block: The last block to search (inclusive). Defaults to the current head.
+        batch_size: The number of contracts to resolve at once.
+        **page_kwargs: Additional kwargs for :meth:`~ape_tokens.history.iter_transfer_logs`.
+
+    Returns:
+        Iterator[TokenInstance]: Tokens, in the order they were first transferred.
+    """
+
+    if stop_block is None:
+        stop_block = ManagerAccessMixin.chain_manager.blocks.height
+
+    addresses = [ManagerAccessMixin.conversion_manager.convert(a, AddressType) for a in accounts]
+    if not addresses:
+        raise ValueError("No accounts to discover tokens for.")
+
+    seen: set[AddressType] = set()
+    unresolved: list[AddressType] = []
+
+    for log in iter_transfer_logs(None, start_block, stop_block, addresses, **page_kwargs):
+        if log.contract_address in seen:
+            continue
+
+        seen.add(log.contract_address)
+        unresolved.append(log.contract_address)
+
+        if len(unresolved) >= batch_size:
+            yield from resolve_tokens(unresolved)
+            unresolved = []
+
+    if unresolved:
+        yield from resolve_tokens(unresolved)
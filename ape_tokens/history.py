@@ -0,0 +1,328 @@
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from typing import TYPE_CHECKING, NamedTuple
+
+from ape.exceptions import ProviderError
+from ape.logging import get_logger
+from ape.types import AddressType
+from ape.utils import ManagerAccessMixin, cached_property
+
+from .batch import balances_of
+from .types import ERC20
+
+if TYPE_CHECKING:
+    from ape.api.address import BaseAddress
+    from ape.types import ContractLog
+
+    from .types import TokenInstance
+
+logger = get_logger(__package__)
+
+# NOTE: Initial window, adjusted as logs are fetched (see `iter_transfer_logs`)
+DEFAULT_PAGE_SIZE = 10_000
+MAX_PAGE_SIZE = 1_000_000
+# NOTE: Most RPCs limit `eth_getLogs` responses to ~10,000 logs
+DEFAULT_MAX_LOGS = 5_000
+
+
+def iter_transfer_logs(
+    token: "TokenInstance | None",
+    start_block: int,
+    stop_block: int,
+    accounts: Iterable[AddressType] | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_logs: int = DEFAULT_MAX_LOGS,
+) -> Iterator["ContractLog"]:
+    """
+    Stream the Transfer logs of a token, in order, using paged ``eth_getLogs`` requests.
+
+    The size of each page (block range) adapts to the density of logs: sparse pages grow the
+    range, while dense pages (or requests the RPC rejects) shrink it. Each page is fetched with a
+    single ``eth_getLogs`` request per direction (i.e. not split up any further by the provider).
+
+    ```{note}
+    ERC721 Transfers (which share the event signature, but index the token id) are skipped.
+    ```
+
+    Args:
+        token: The token to get the Transfer logs of. If ``None``, gets the Transfer logs of
+          every contract (which should only be done together with ``accounts``).
+        start_block: The first block to get logs from.
+        stop_block: The last block to get logs from (inclusive).
+        accounts: Only get transfers to or from these accounts. Defaults to all transfers.
+        page_size: The initial number of blocks to request logs for at once.
+        max_logs: The number of logs per page to aim to stay under.
+
+    Returns:
+        Iterator[ContractLog]: Decoded Transfer logs, ordered by block and log index.
+    """
+    from ape.types import LogFilter
+
+    transfer_abi = ERC20.events["Transfer"]
+    if accounts is None:
+        topic_filters = [transfer_abi.encode_topics({})]
+
+    else:  # NOTE: 1 query per direction, since topics can't be OR'd across positions
+        accounts = list(accounts)
+        topic_filters = [
+            transfer_abi.encode_topics(dict(sender=accounts)),
+            transfer_abi.encode_topics(dict(receiver=accounts)),
+        ]
+
+    from ape_ethereum.provider import Web3Provider
+    from web3.exceptions import Web3RPCError
+
+    provider = ManagerAccessMixin.provider
+    # NOTE: `Web3Provider.get_contract_logs` splits every range into pages of (at most)
+    #       `provider.block_page_size` blocks, no matter how sparse the logs are, and decodes
+    #       every log it finds, so request the raw logs of each page directly instead
+    request_directly = (
+        isinstance(provider, Web3Provider)
+        and type(provider).get_contract_logs is Web3Provider.get_contract_logs
+    )
+
+    def get_logs(log_filter: LogFilter) -> list["ContractLog"]:
+        if not isinstance(provider, Web3Provider):
+            # NOTE: Decoded by the provider, so ERC721 Transfers can't be skipped here
+            return list(provider.get_contract_logs(log_filter))
+
+        filter_params = log_filter.model_dump(mode="json")
+        if not filter_params["address"]:
+            del filter_params["address"]  # NOTE: Any contract
+
+        if request_directly:
+            raw_logs = provider.make_request("eth_getLogs", [filter_params])
+
+        else:  # NOTE: e.g. local providers, whose `make_request` doesn't format the filter
+            raw_logs = provider.web3.eth.get_logs(filter_params)
+
+        # NOTE: ERC721 Transfers share the signature, but index all 3 arguments (so they have 4
+        #       topics and no data), and fail to decode as ERC20 Transfers
+        return list(
+            provider.network.ecosystem.decode_logs(
+                [log for log in raw_logs if len(log["topics"]) == 3 and _has_data(log)],
+                *log_filter.events,
+            )
+        )
+
+    block_number = start_block
+    while block_number <= stop_block:
+        page_end = min(block_number + page_size - 1, stop_block)
+
+        try:
+            # NOTE: Transfers between 2 filtered accounts are found by both queries
+            logs = {
+                (log.block_number, log.log_index): log
+                for topic_filter in topic_filters
+                for log in get_logs(
+                    LogFilter(
+                        addresses=[token.address] if token is not None else [],
+                        events=[transfer_abi],
+                        topic_filter=topic_filter,
+                        start_block=block_number,
+                        stop_block=page_end,
+                    )
+                )
+            }
+
+        except (ProviderError, Web3RPCError) as err:
+            if page_size == 1:
+                raise  # NOTE: Can't make the page any smaller
+
+            page_size = max(page_size // 2, 1)
+            logger.debug(f"Reducing page size to {page_size} blocks: {err}")
+            continue
+
+        for log_id in sorted(logs):
+            yield logs[log_id]
+
+        block_number = page_end + 1
+
+        if len(logs) > max_logs:
+            page_size = max(page_size // 2, 1)
+
+        elif len(logs) < max_logs // 2:
+            page_size = min(page_size * 2, MAX_PAGE_SIZE)
+
+
+def _has_data(log: dict) -> bool:
+    # NOTE: Raw logs from the RPC have hex str data, but `web3` converts it to bytes
+    return log["data"] not in ("", "0x", b"")
+
+
+class BalanceChange(NamedTuple):
+    """A change to the balance of an account, caused by a single Transfer log."""
+
+    block_number: int
+    transaction_hash: str
+    log_index: int
+    account: AddressType
+    amount: int
+    """The (signed) raw amount the balance changed by."""
+    raw_balance: int
+    """The raw balance after the change."""
+
+
+class BalanceHistory(ManagerAccessMixin):
+    """
+    Balances of accounts for a token over time, reconstructed from its Transfer logs.
+
+    Usage example::
+
+        >>> history = BalanceHistory.from_logs(usdc, accounts=[account], start_block=20_000_000)
+        >>> history.balance_at(account, 20_100_000)
+        Decimal('100.5')
+        >>> for change in history.changes(account):
+        ...     print(change.block_number, change.amount)
+
+    ```{note}
+    Balances are stored in raw (integer) form, and only converted to Decimal when read.
+    ```
+    """
+
+    def __init__(
+        self,
+        token: "TokenInstance",
+        start_block: int = 0,
+        initial_balances: dict[AddressType, int] | None = None,
+        accounts: Iterable[AddressType] | None = None,
+    ):
+        self.token = token
+        self.start_block = start_block
+
+        # NOTE: If `None`, tracks every account
+        self._accounts = None if accounts is None else set(accounts)
+        self._initial_balances = initial_balances or dict()
+        self._changes: list[BalanceChange] = []
+        # NOTE: Parallel lists per account (block number, raw balance at end of block) for bisecting
+        self._blocks: dict[AddressType, list[int]] = dict()
+        self._raw_balances: dict[AddressType, list[int]] = dict()
+
+    @classmethod
+    def from_logs(
+        cls,
+        token: "TokenInstance",
+        accounts: Iterable["BaseAddress | AddressType | str"] | None = None,
+        start_block: int = 0,
+        stop_block: int | None = None,
+        **page_kwargs,
+    ) -> "BalanceHistory":
+        """
+        Reconstruct the balance history of a token between ``start_block`` and ``stop_block``.
+
+        ```{note}
+        Starting after block 0 requires ``accounts``, since their balances at ``start_block - 1``
+        are read from chain (which requires an archive node for older blocks).
+        ```
+
+        Args:
+            token: The token to reconstruct the balance history of.
+            accounts: Only track these accounts. Defaults to every account (from block 0 only).
+            start_block: The first block to include. Defaults to ``0``.
+            stop_block: The last block to include (inclusive). Defaults to the current head.
+            **page_kwargs: Additional kwargs for :meth:`~ape_tokens.history.iter_transfer_logs`.
+
+        Returns:
+            :class:`~ape_tokens.history.BalanceHistory`
+        """
+
+        if stop_block is None:
+            stop_block = cls.chain_manager.blocks.height
+
+        initial_balances: dict[AddressType, int] = dict()
+        addresses: list[AddressType] | None = None
+        if accounts is not None:
+            addresses = [cls.conversion_manager.convert(a, AddressType) for a in accounts]
+
+            if start_block > 0:
+                initial_balances = balances_of([token], addresses, block_id=start_block - 1).get(
+                    token.address, {}
+                )
+
+        elif start_block > 0:
+            raise ValueError("Must provide `accounts` when not starting from block 0.")
+
+        history = cls(
+            token,
+            start_block=start_block,
+            initial_balances=initial_balances,
+            accounts=addresses,
+        )
+        for log in iter_transfer_logs(token, start_block, stop_block, addresses, **page_kwargs):
+            history.apply(log)
+
+        return history
+
+    @cached_property
+    def _scale(self) -> Decimal:
+        return Decimal(10 ** self.token.decimals())
+
+    @property
+    def accounts(self) -> set[AddressType]:
+        """All accounts with a known balance (at any point)."""
+        return {*self._initial_balances, *self._blocks}
+
+    def apply(self, log: "ContractLog"):
+        """Fold a Transfer log into the history (logs must be applied in order)."""
+
+        for account, amount in ((log.sender, -log.amount), (log.receiver, log.amount)):
+            if self._accounts is not None and account not in self._accounts:
+                continue
+
+            blocks = self._blocks.setdefault(account, [])
+            raw_balances = self._raw_balances.setdefault(account, [])
+            raw_balance = (
+                raw_balances[-1] if raw_balances else self._initial_balances.get(account, 0)
+            ) + amount
+
+            if blocks and blocks[-1] == log.block_number:
+                raw_balances[-1] = raw_balance  # NOTE: Only keep the end-of-block balance
+
+            else:
+                blocks.append(log.block_number)
+                raw_balances.append(raw_balance)
+
+            self._changes.append(
+                BalanceChange(
+                    block_number=log.block_number,
+                    transaction_hash=log.transaction_hash,
+                    log_index=log.log_index,
+                    account=account,
+                    amount=amount,
+                    raw_balance=raw_balance,
+                )
+            )
+
+    def raw_balance_at(self, account: AddressType, block_number: int) -> int:
+        """
+        Get the raw (integer) balance of ``account`` at the end of ``block_number``.
+
+        Raises:
+            KeyError: If ``account`` is not tracked by this history.
+            ValueError: If ``block_number`` is before the start of this history.
+        """
+
+        # NOTE: Initial balances are as of the block before the start
+        if block_number < self.start_block - 1:
+            raise ValueError(f"Block {block_number} is before start of history.")
+
+        elif self._accounts is not None and account not in self._accounts:
+            raise KeyError(f"Not tracking {account}")
+
+        blocks = self._blocks.get(account, [])
+        if (idx := bisect_right(blocks, block_number)) == 0:
+            return self._initial_balances.get(account, 0)
+
+        return self._raw_balances[account][idx - 1]
+
+    def balance_at(self, account: AddressType, block_number: int) -> Decimal:
+        """Get the balance of ``account`` at the end of ``block_number``."""
+        return self.raw_balance_at(account, block_number) / self._scale
+
+    def changes(self, account: AddressType | None = None) -> Iterator[BalanceChange]:
+        """Iterate over all balance changes (of ``account``, if provided), in order."""
+
+        for change in self._changes:
+            if account is None or change.account == account:
+                yield change
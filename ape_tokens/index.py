@@ -0,0 +1,538 @@
+import sys
+import time
+from collections.abc import Iterable, Iterator, MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import RLock
+from typing import TYPE_CHECKING, Any, cast
+
+from ape.logging import get_logger
+from eth_utils import is_address, to_checksum_address
+from tokenlists import TokenInfo, TokenList, TokenListManager
+
+if TYPE_CHECKING:
+    from ape.types import AddressType
+
+    from .config import ListInfo
+
+logger = get_logger(__package__)
+
+
+class TokenRecord:
+    """
+    Compact form of a tokenlist entry, as stored in a `TokenIndex`.
+
+    ```{note}
+    Addresses are stored as 20 raw bytes, and strings are interned (so symbols and tags that
+    appear in many lists are only stored once). Use `to_tokeninfo` to get the full entry.
+    ```
+    """
+
+    __slots__ = ("address_bytes", "symbol", "name", "decimals", "logo_uri", "tags", "extensions")
+
+    def __init__(self, token_info: TokenInfo):
+        self.address_bytes = bytes.fromhex(token_info.address[2:])
+        self.symbol = sys.intern(token_info.symbol)
+        self.name = sys.intern(token_info.name)
+        self.decimals = token_info.decimals
+        self.logo_uri = token_info.logoURI
+        self.tags = tuple(map(sys.intern, token_info.tags)) if token_info.tags else None
+        self.extensions = token_info.extensions
+
+    def __repr__(self) -> str:
+        return f"<TokenRecord {self.symbol} {self.address}>"
+
+    @property
+    def address(self) -> "AddressType":
+        return to_checksum_address(self.address_bytes)
+
+    def to_tokeninfo(self, chain_id: int) -> TokenInfo:
+        """Re-create the full tokenlist entry (with a checksummed address)."""
+
+        return TokenInfo.model_construct(
+            chainId=chain_id,
+            address=self.address,
+            name=self.name,
+            decimals=self.decimals,
+            symbol=self.symbol,
+            logoURI=self.logo_uri,
+            tags=list(self.tags) if self.tags is not None else None,
+            extensions=self.extensions,
+        )
+
+
+class TokenIndex:
+    """
+    Hash-indexed table of the tokens in a single tokenlist, for a single chain.
+
+    ```{note}
+    Symbol lookups are exact first, then case-insensitive (to match `TokenListManager`).
+    A symbol that matches more than one token is considered ambiguous, and will not resolve.
+    ```
+
+    ```{note}
+    Tokens are stored as compact `TokenRecord` entries (and every lookup table only stores
+    positions), so the full `TokenInfo` is only re-created when it is asked for.
+    ```
+    """
+
+    def __init__(self, tokens: Iterable[TokenInfo], tag_ids: Iterable[str] | None = None):
+        self.chain_id: int | None = None
+        self.records: list[TokenRecord] = []
+        # NOTE: Every lookup table maps to positions in `self.records`
+        self.by_symbol: dict[str, list[int]] = dict()
+        self.by_address: dict[bytes, int] = dict()
+        # NOTE: Inverted index of tag id -> positions
+        self.by_tag: dict[str, set[int]] = dict()
+        # NOTE: Tags defined by the tokenlist (tokens may only be filtered by these)
+        self.tag_ids = set(tag_ids or [])
+        self._by_lower_symbol: dict[str, list[int]] = dict()
+
+        self.extend(tokens)
+
+    def extend(self, tokens: Iterable[TokenInfo], tag_ids: Iterable[str] | None = None):
+        """
+        Add the tokens of a lower-priority tokenlist to the index.
+
+        ```{note}
+        Tokens with an address that is already in the index are skipped, and symbols that are
+        already in the index keep resolving to the tokens added before (so the new tokens with
+        those symbols can only be found by address).
+        ```
+        """
+
+        self.tag_ids.update(tag_ids or [])
+        # NOTE: Symbols of earlier lists shadow the same symbols (in any case) from this one
+        shadowed_symbols = set(self._by_lower_symbol)
+
+        for token_info in tokens:
+            record = TokenRecord(token_info)
+            if record.address_bytes in self.by_address:
+                continue  # NOTE: Duplicate entry, first one wins
+
+            self.chain_id = token_info.chainId
+            position = len(self.records)
+            for tag_id in record.tags or []:
+                self.by_tag.setdefault(tag_id, set()).add(position)
+
+            self.records.append(record)
+            if (lower_symbol := record.symbol.lower()) not in shadowed_symbols:
+                self.by_symbol.setdefault(record.symbol, []).append(position)
+                self._by_lower_symbol.setdefault(lower_symbol, []).append(position)
+
+            self.by_address[record.address_bytes] = position
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[TokenRecord]:
+        return iter(self.records)
+
+    def __contains__(self, symbol: object) -> bool:
+        # NOTE: Exact match only, which is what the converters use for `is_convertible`
+        return symbol in self.by_symbol
+
+    def get_by_address(self, address: str) -> TokenRecord | None:
+        """Find a token by its (any-case) address, or ``None`` if it is not in the index."""
+
+        if not is_address(address):
+            return None
+
+        elif (position := self.by_address.get(bytes.fromhex(address[-40:]))) is None:
+            return None
+
+        return self.records[position]
+
+    def get_record(self, symbol_or_address: str) -> TokenRecord:
+        """
+        Find a token by its symbol or (any-case) address.
+
+        Raises:
+            ValueError: If the token is not in the index, or the symbol is ambiguous.
+        """
+
+        if not (matches := self.by_symbol.get(symbol_or_address)):
+            matches = self._by_lower_symbol.get(symbol_or_address.lower(), [])
+
+        if len(matches) == 1:
+            return self.records[matches[0]]
+
+        elif len(matches) > 1:
+            raise ValueError(f"Multiple tokens with symbol '{symbol_or_address}' found.")
+
+        elif record := self.get_by_address(symbol_or_address):
+            return record
+
+        raise ValueError(f"Token '{symbol_or_address}' does not exist in index.")
+
+    def get_token_info(self, symbol_or_address: str) -> TokenInfo:
+        """
+        Find the full tokenlist entry of a token by its symbol or (any-case) address.
+
+        Raises:
+            ValueError: If the token is not in the index, or the symbol is ambiguous.
+        """
+
+        return self.get_record(symbol_or_address).to_tokeninfo(cast(int, self.chain_id))
+
+    def filter(self, tags: set[str] | None = None) -> Iterator[TokenRecord]:
+        """
+        Iterate over the tokens whose tags are all within ``tags`` (and defined by the tokenlist).
+
+        ```{note}
+        Uses the inverted tag index, so the matching positions (untagged tokens, plus tokens
+        whose tags are all allowed) are computed with set operations instead of a full scan.
+        ```
+        """
+
+        if tags is None:
+            yield from self.records
+            return
+
+        allowed_tags = tags & self.tag_ids
+        tagged: set[int] = set()
+        allowed: set[int] = set()
+        excluded: set[int] = set()
+        for tag_id, positions in self.by_tag.items():
+            tagged |= positions
+            if tag_id in allowed_tags:
+                allowed |= positions
+            else:
+                excluded |= positions
+
+        matching = (set(range(len(self.records))) - tagged) | (allowed - excluded)
+        for position in sorted(matching):
+            yield self.records[position]
+
+
+class InstalledTokenLists(MutableMapping[str, TokenList]):
+    """
+    Installed tokenlists by name, which are read from the cache folder when they are used,
+    instead of being kept in memory (a `TokenIndex` is kept of the parts that are used).
+
+    ```{note}
+    Lists are only kept in memory until they are written to the cache folder (see `release`),
+    or if they are never written there at all.
+    ```
+
+    ```{note}
+    A list that is missing is looked for in the cache folder again, since it may have been
+    installed since (e.g. in the background, by another manager).
+    ```
+    """
+
+    def __init__(self, cache_folder: Path, tokenlists: dict[str, TokenList] | None = None):
+        self.cache_folder = cache_folder
+        self.versions: dict[str, Any] = dict()
+        self._in_memory: dict[str, TokenList] = dict()
+
+        for tokenlist in (tokenlists or {}).values():
+            self.versions[tokenlist.name] = tokenlist.version
+
+    def _path(self, tokenlist_name: str) -> Path:
+        return self.cache_folder.joinpath(f"{tokenlist_name}.json")
+
+    def _load_version(self, tokenlist_name: str) -> bool:
+        if not (path := self._path(tokenlist_name)).exists():
+            return False
+
+        try:
+            tokenlist = TokenList.model_validate_json(path.read_text())
+
+        except ValueError:
+            return False  # NOTE: Still being written
+
+        self.versions[tokenlist.name] = tokenlist.version
+        return tokenlist.name == tokenlist_name
+
+    def __getitem__(self, tokenlist_name: str) -> TokenList:
+        if (tokenlist := self._in_memory.get(tokenlist_name)) is not None:
+            return tokenlist
+
+        elif tokenlist_name not in self.versions and not self._load_version(tokenlist_name):
+            raise KeyError(tokenlist_name)
+
+        return TokenList.model_validate_json(self._path(tokenlist_name).read_text())
+
+    def __setitem__(self, tokenlist_name: str, tokenlist: TokenList):
+        self.versions[tokenlist_name] = tokenlist.version
+        self._in_memory[tokenlist_name] = tokenlist
+
+    def __delitem__(self, tokenlist_name: str):
+        del self.versions[tokenlist_name]
+        self._in_memory.pop(tokenlist_name, None)
+
+    def __contains__(self, tokenlist_name: object) -> bool:
+        # NOTE: Avoids reading the list (which is what `Mapping.__contains__` would do)
+        return tokenlist_name in self.versions or (
+            isinstance(tokenlist_name, str) and self._load_version(tokenlist_name)
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.versions))
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def release(self, tokenlist_name: str):
+        """Stop keeping ``tokenlist_name`` in memory, if it has been written to the cache folder."""
+
+        if self._path(tokenlist_name).exists():
+            self._in_memory.pop(tokenlist_name, None)
+
+
+class IndexedTokenListManager(TokenListManager):
+    """
+    `TokenListManager` that maintains a `TokenIndex` per (tokenlist, chain_id).
+
+    Each index is built on first use, and is only rebuilt after the installed tokenlists
+    or the default tokenlist have changed. If ``priority`` is set, lookups use one merged
+    index of those tokenlists instead (see `get_index`).
+
+    ```{note}
+    Required tokenlists are installed in the background (see `install_required`), so lists
+    that are already installed can be used while the others are still downloading.
+    ```
+    """
+
+    installed_tokenlists: InstalledTokenLists  # type: ignore[assignment]
+
+    def __init__(self):
+        super().__init__()
+
+        self.installed_tokenlists = InstalledTokenLists(
+            self.cache_folder, self.installed_tokenlists
+        )
+        self._indexes: dict[tuple[str, int], TokenIndex] = dict()
+        # NOTE: Tokenlists to merge (highest priority first), instead of using the default list
+        self.priority: list[str] = []
+        self._merged_indexes: dict[tuple[tuple[str, ...], int], TokenIndex] = dict()
+        # NOTE: Background installs by (required) list name, see `install_required`
+        self._pending: dict[str, Future[str]] = dict()
+        self._required: dict[str, ListInfo] = dict()
+        # NOTE: Errors of failed installs, until they are raised (see `get_tokenlist`)
+        self._failed: dict[str, Exception] = dict()
+        self._executor: ThreadPoolExecutor | None = None
+        # NOTE: Default list that was still being installed when set, so not yet saved to disk
+        self._deferred_default: str | None = None
+        # NOTE: Re-entrant, since callbacks of finished installs run straight away
+        self._lock = RLock()
+
+    def install_tokenlist(self, uri: str) -> str:
+        previous_versions = dict(self.installed_tokenlists.versions)
+        tokenlist_name = super().install_tokenlist(uri)
+        self.installed_tokenlists.release(tokenlist_name)
+
+        # NOTE: Re-installing the same version of a list (e.g. a refresh) keeps its indexes
+        if (
+            previous_versions.get(tokenlist_name)
+            != self.installed_tokenlists.versions[tokenlist_name]
+        ):
+            for key in list(self._indexes):
+                if key[0] == tokenlist_name:
+                    self._indexes.pop(key, None)
+
+            self._merged_indexes.clear()
+
+        return tokenlist_name
+
+    def remove_tokenlist(self, tokenlist_name: str) -> None:
+        super().remove_tokenlist(tokenlist_name)
+        self._indexes.clear()
+        self._merged_indexes.clear()
+
+    def _is_stale(self, tokenlist_name: str, refresh_interval: float | None) -> bool:
+        if tokenlist_name not in self.installed_tokenlists:
+            return True
+
+        elif refresh_interval is None:
+            return False  # NOTE: Local copy never expires
+
+        cached_file = self.cache_folder.joinpath(f"{tokenlist_name}.json")
+        return (
+            not cached_file.exists() or time.time() - cached_file.stat().st_mtime > refresh_interval
+        )
+
+    def install_required(
+        self,
+        required: Iterable["ListInfo"],
+        refresh_interval: float | None = None,
+    ) -> dict[str, "Future[str]"]:
+        """
+        Install the ``required`` tokenlists concurrently, in the background.
+
+        Lists with a local copy are not downloaded again, unless that copy is older than
+        ``refresh_interval`` seconds (in which case the local copy is used until the new one
+        arrives). Each list is only downloaded once at a time, and looking up a list that is
+        still being installed waits for its download to finish. If the download fails, the next
+        lookup raises its error, and the lookup after that downloads it again.
+
+        Args:
+            required: The tokenlists to install.
+            refresh_interval: How old (in seconds) a local copy can be before it is downloaded
+              again. Defaults to never downloading a list again once it is installed.
+
+        Returns:
+            dict[str, Future[str]]: The downloads that were started, by required list name.
+        """
+
+        started: dict[str, Future[str]] = dict()
+        with self._lock:
+            for required_tokenlist in required:
+                if required_tokenlist.name in self._pending or not self._is_stale(
+                    required_tokenlist.name, refresh_interval
+                ):
+                    continue
+
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix="ape-tokens")
+
+                self._required[required_tokenlist.name] = required_tokenlist
+                self._failed.pop(required_tokenlist.name, None)
+                future = self._executor.submit(self._install_required, required_tokenlist)
+                self._pending[required_tokenlist.name] = started[required_tokenlist.name] = future
+
+        return started
+
+    def _install_required(self, required_tokenlist: "ListInfo") -> str:
+        # NOTE: Runs in the background, and is done with `self._pending` before its future is
+        #       resolved (so anything waiting on it sees the outcome)
+        required_name = required_tokenlist.name
+        try:
+            installed_name = self.install_tokenlist(required_tokenlist.uri)
+
+        except Exception as err:
+            with self._lock:
+                del self._pending[required_name]
+
+                if required_name not in self.installed_tokenlists:
+                    # NOTE: Raised once by `get_tokenlist`, which then installs it again
+                    self._failed[required_name] = err
+                    raise
+
+            # NOTE: Keep using the local copy
+            logger.warning(f"Failed to refresh tokenlist '{required_name}': {err}")
+            return required_name
+
+        if installed_name != required_name:
+            # TODO: Allow setting custom name via `TokenListManager.install_tokenlist`
+            logger.warning(
+                f"Installed list name '{installed_name}' does not match "
+                f"requirement '{required_name}'. This could be problematic."
+            )
+
+        with self._lock:
+            del self._pending[required_name]
+            self._save_deferred_default()
+
+        return installed_name
+
+    def _save_deferred_default(self):
+        # NOTE: Must be called with `self._lock` held
+        if (
+            self._deferred_default is not None
+            and self._deferred_default == self.default_tokenlist
+            and self._deferred_default in self.installed_tokenlists
+        ):
+            # NOTE: Also writes it to disk, where other managers (e.g. the converters') read it
+            super().set_default_tokenlist(self._deferred_default)
+            self._deferred_default = None
+
+    def set_default_tokenlist(self, name: str) -> None:
+        with self._lock:
+            if name not in self.installed_tokenlists and name in self._pending:
+                # NOTE: Checked (and saved) once installed (see `_install_required`)
+                self.default_tokenlist = self._deferred_default = name
+                return
+
+            self._deferred_default = None
+
+        super().set_default_tokenlist(name)
+
+    def get_tokenlist(self, token_listname: str | None = None) -> TokenList:
+        if (
+            not (tokenlist_name := token_listname or self.default_tokenlist)
+            and (default_file := self.cache_folder.joinpath(".default")).exists()
+        ):
+            # NOTE: May have been set since (e.g. once another manager's install finished)
+            tokenlist_name = self.default_tokenlist = default_file.read_text()
+
+        if tokenlist_name not in self.installed_tokenlists:
+            with self._lock:
+                if error := self._failed.pop(tokenlist_name, None):
+                    raise error  # NOTE: Only once, the next lookup installs it again
+
+                elif tokenlist_name not in self._pending and (
+                    required_tokenlist := self._required.get(tokenlist_name)
+                ):
+                    self.install_required([required_tokenlist])
+
+                future = self._pending.get(tokenlist_name)
+
+            if future is not None:
+                try:
+                    future.result()  # NOTE: Raises if the install failed
+
+                except Exception:
+                    with self._lock:
+                        # NOTE: Already raised here
+                        self._failed.pop(tokenlist_name, None)
+
+                    raise
+
+        return super().get_tokenlist(token_listname)
+
+    # NOTE: Indexes are keyed by list name, so changing the default list needs no invalidation
+
+    def get_index(self, chain_id: int, token_listname: str | None = None) -> TokenIndex:
+        """
+        Get the (cached) index of tokens for ``chain_id`` from ``token_listname``.
+
+        If ``token_listname`` is not given, uses the merged index of the ``priority`` lists
+        (or the default tokenlist, if ``priority`` is not set).
+
+        Raises:
+            ValueError: If the tokenlist is not installed (or no default list is set).
+        """
+
+        if token_listname is None and self.priority:
+            return self.get_merged_index(chain_id, self.priority)
+
+        key = (token_listname or self.default_tokenlist, chain_id)
+        if (index := self._indexes.get(key)) is None:
+            # NOTE: Only the index is kept, the full tokenlist is released once it is built
+            tokenlist = self.get_tokenlist(token_listname)
+            index = TokenIndex(
+                (t for t in tokenlist.tokens if t.chainId == chain_id),
+                tag_ids=tokenlist.tags,
+            )
+            self._indexes[key] = index
+
+        return index
+
+    def get_merged_index(self, chain_id: int, tokenlist_names: Iterable[str]) -> TokenIndex:
+        """
+        Get the (cached) index of tokens for ``chain_id`` from all of ``tokenlist_names``.
+
+        ```{note}
+        Lists are merged in order, so when lists share a symbol (or address), the token from
+        the earliest list wins. The merged index is built once, and then reused.
+        ```
+
+        Raises:
+            ValueError: If any of the tokenlists are not installed.
+        """
+
+        key = (tuple(tokenlist_names), chain_id)
+        if (index := self._merged_indexes.get(key)) is None:
+            index = TokenIndex([])
+            for tokenlist_name in key[0]:
+                tokenlist = self.get_tokenlist(tokenlist_name)
+                index.extend(
+                    (t for t in tokenlist.tokens if t.chainId == chain_id),
+                    tag_ids=tokenlist.tags,
+                )
+
+            self._merged_indexes[key] = index
+
+        return index
@@ -1,24 +1,32 @@
-from collections.abc import Iterable, Iterator
+from collections.abc import Iterable, Iterator, Sequence
 from decimal import Decimal
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Generic, Literal, TypeVar, cast
 
 from ape.contracts import ContractInstance
 from ape.exceptions import ConversionError
 from ape.logging import get_logger
 from ape.types import AddressType
 from ape.utils import ManagerAccessMixin, cached_property
-from tokenlists import TokenListManager
 
+from .batch import balances_of, batch_call, batch_executor, run_async
+from .cache import balance_checkpoints, lookup_misses
+from .history import BalanceHistory
+from .index import IndexedTokenListManager, TokenIndex
 from .types import ConvertsToToken, Token, TokenInstance
 
 if TYPE_CHECKING:
     from ape.api.address import BaseAddress
     from silverback import SilverbackBot
 
+    from .allowances import TokenAllowances
     from .config import TokensConfig
 
 logger = get_logger(__package__)
 
+MonitorMode = Literal["address", "token"]
+# NOTE: Per-token readers of a manager (see `_BaseTokenReaders`)
+ReaderT = TypeVar("ReaderT", "TokenBalances", "TokenAllowances")
+
 
 class TokenManager(Iterable[TokenInstance]):
     @property
@@ -26,41 +34,57 @@ class TokenManager(Iterable[TokenInstance]):
         return ManagerAccessMixin.config_manager.get_config("tokens")
 
     @cached_property
-    def _manager(self) -> TokenListManager:
-        manager = TokenListManager()
-
-        for required_tokenlist in self.config.required:
-            if required_tokenlist.name not in manager.installed_tokenlists:
-                if (
-                    installed_name := manager.install_tokenlist(required_tokenlist.uri)
-                ) != required_tokenlist.name:
-                    # TODO: Allow setting custom name via `TokenListManager.install_tokenlist`
-                    logger.warning(
-                        f"Installed list name '{installed_name}' does not match "
-                        f"requirement '{required_tokenlist.name}'. This could be problematic."
-                    )
-
-        # TODO: Allow sourcing from multiple lists in `TokenListManager`,
-        #       and set priority here instead
+    def _manager(self) -> IndexedTokenListManager:
+        manager = IndexedTokenListManager()
+        # NOTE: Does not block, lists are only waited on when they are used
+        manager.install_required(
+            self.config.required, refresh_interval=self.config.refresh_interval
+        )
+
         if default_selected := self.config.default:
             manager.set_default_tokenlist(default_selected)
 
+        # NOTE: If set, lookups use one merged index of these lists (instead of the default)
+        manager.priority = list(self.config.priority)
+
         return manager
 
     def __repr__(self) -> str:
+        if priority := self._manager.priority:
+            return f"<ape_tokens.TokenManager priority={priority}>"
+
         return f"<ape_tokens.TokenManager default='{self._manager.default_tokenlist}'>"
 
-    def __getitem__(self, symbol_or_address: str) -> TokenInstance:
+    @property
+    def _index(self) -> TokenIndex:
         chain_id = ManagerAccessMixin.network_manager.network.chain_id
+        return self._manager.get_index(chain_id)
+
+    def __getitem__(self, symbol_or_address: str) -> TokenInstance:
+        index: TokenIndex | None = None
         try:
-            token_info = self._manager.get_token_info(symbol_or_address, chain_id=chain_id)
+            # NOTE: Raises if no default tokenlist is set (or installed)
+            index = self._index
+            record = index.get_record(symbol_or_address)
             # NOTE: Token is in our token list
-            return TokenInstance.from_tokeninfo(token_info)
+            return TokenInstance.from_tokeninfo(record)
 
         except ValueError:
-            # NOTE: Fallback to loading by address
+            pass
+
+        # NOTE: The index is rebuilt whenever the chain or tokenlists change, which expires misses
+        if lookup_misses.is_miss(symbol_or_address, generation=index):
+            raise ConversionError(f"No conversion registered to handle '{symbol_or_address}'.")
+
+        try:
+            # NOTE: Fallback to loading by address (which may require an ENS lookup)
             address = ManagerAccessMixin.conversion_manager.convert(symbol_or_address, AddressType)
-            return Token.at(address)
+
+        except ConversionError:
+            lookup_misses.add(symbol_or_address, generation=index)
+            raise
+
+        return Token.at(address)
 
     def get(self, val: str) -> TokenInstance | None:
         try:
@@ -69,6 +93,10 @@ class TokenManager(Iterable[TokenInstance]):
         except ConversionError:
             return None
 
+    async def aget(self, val: str) -> TokenInstance | None:
+        """Awaitable version of `.get`, which does not block the event loop."""
+        return await run_async(self.get, val)
+
     def __contains__(self, obj: object) -> bool:
         if isinstance(obj, str):
             return self.get(obj) is not None
@@ -85,32 +113,141 @@ class TokenManager(Iterable[TokenInstance]):
             raise AttributeError(str(e)) from None
 
     def __len__(self) -> int:
-        tokenlist = self._manager.get_tokenlist()
-        return len(tokenlist.tokens)
+        # NOTE: Only counts tokens on the connected chain
+        return len(self._index)
 
     def filter(self, tags: set[str] | None = None) -> Iterator[TokenInstance]:
-        chain_id = ManagerAccessMixin.network_manager.network.chain_id
-        tag_ids = {
-            tag_id
-            for tag_id in (self._manager.get_tokenlist().tags or [])
-            if tag_id in (tags or set())
-        }
-
-        # TODO: Move `tags=tags` of `tokenlists.TokenListManager.get_tokens`
-        for token_info in self._manager.get_tokens(chain_id=chain_id):
-            if tags is None or set(token_info.tags) <= tag_ids:
-                yield TokenInstance.from_tokeninfo(token_info)
+        # NOTE: Uses the (cached) per-chain index, instead of scanning the whole tokenlist
+        for record in self._index.filter(tags):
+            yield TokenInstance.from_tokeninfo(record)
 
     def __iter__(self) -> Iterator[TokenInstance]:
         yield from self.filter()  # NOTE: No filter applied = all tokens
 
 
+class BlockMetrics:
+    """
+    Buffer of balance updates, so each (token, address) metric is only emitted once per block.
+
+    ```{note}
+    Balances are recorded as of the last Transfer log (of each block) that changed them, so the
+    emitted value is always the balance at the end of that block (even if later blocks have
+    already been applied by the time the buffer is flushed).
+    ```
+    """
+
+    def __init__(self):
+        self._pending: dict[int, dict[tuple[TokenBalances, AddressType], int]] = dict()
+
+    def __len__(self) -> int:
+        return sum(map(len, self._pending.values()))
+
+    def add(self, block_number: int, token_balances: "TokenBalances", address: AddressType):
+        self._pending.setdefault(block_number, dict())[(token_balances, address)] = (
+            token_balances._balances[address]
+        )
+
+    def flush(self, before_block: int) -> dict[str, Decimal]:
+        """Get metrics for all updates in blocks prior to ``before_block`` (which are complete)."""
+
+        metrics: dict[str, Decimal] = dict()
+
+        # NOTE: Oldest first, so later blocks override earlier ones
+        for block_number in sorted(b for b in self._pending if b < before_block):
+            for (token_balances, address), raw_balance in self._pending.pop(block_number).items():
+                metrics[token_balances._metric_name(address)] = raw_balance / token_balances._scale
+
+        return metrics
+
+
+class BalanceJournal:
+    """
+    Recent balance changes of one account (for one token), keyed by the Transfer log that caused
+    them, so that they can be reversed in a reorg and redelivered logs are only applied once.
+
+    The base balance is the balance as of ``base_block``, i.e. the current balance minus all the
+    changes still in the journal.
+
+    ```{note}
+    Changes are folded into the base balance (dropped from the journal) once their block is
+    final, so memory only grows with the number of changes in recent (unfinalized) blocks.
+    ```
+    """
+
+    __slots__ = ("_deltas", "base_block", "needs_reload")
+
+    def __init__(self, base_block: int = -1):
+        # NOTE: The last block included in the base balance
+        self.base_block = base_block
+        self._deltas: dict[tuple[int, int, bool], int] = dict()
+        # NOTE: Set if a reorg removed a change that is already part of the base balance
+        self.needs_reload = False
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    def record(self, block_number: int, log_index: int, amount: int, removed: bool) -> int | None:
+        """
+        Record the change of ``amount`` caused by a log (or its removal, in a reorg).
+
+        Returns:
+            int | None: The change to apply to the current balance, or ``None`` if the log was
+            already applied (or removed), or is already part of the base balance.
+        """
+
+        if block_number <= self.base_block:
+            if removed:
+                self.needs_reload = True
+
+            return None
+
+        # NOTE: Self-transfers change the balance twice for the same log, once in each direction
+        key = (block_number, log_index, amount < 0)
+
+        if removed:
+            if (delta := self._deltas.pop(key, None)) is None:
+                return None
+
+            return -delta
+
+        elif key in self._deltas:
+            return None
+
+        self._deltas[key] = amount
+        return amount
+
+    def pending(self, after_block: int) -> int:
+        """Get the total change from all logs after ``after_block``."""
+        return sum(
+            delta
+            for (block_number, *_), delta in self._deltas.items()
+            if block_number > after_block
+        )
+
+    def rebase(self, block_number: int):
+        """Fold all changes up to (and including) ``block_number`` into the base balance."""
+
+        self.base_block = max(self.base_block, block_number)
+        for key in [key for key in self._deltas if key[0] <= block_number]:
+            del self._deltas[key]
+
+
 class TokenBalances(ManagerAccessMixin):
     def __init__(self, token: TokenInstance):
         self.token = token
 
-        # NOTE: Only used if live-tracking
-        self._balances: dict[AddressType, Decimal] = dict()
+        # NOTE: Only used if live-tracking, in raw (integer) form
+        self._balances: dict[AddressType, int] = dict()
+        self._watched: set[AddressType] = set()
+        # NOTE: Only used if live-tracking, recent changes of each watched address
+        self._journals: dict[AddressType, BalanceJournal] = dict()
+        # NOTE: Only set if coalescing metrics by block
+        self._block_metrics: BlockMetrics | None = None
+
+    @cached_property
+    def _scale(self) -> Decimal:
+        # NOTE: Computed once, so Transfer logs can be applied with only integer arithmetic
+        return Decimal(10 ** self.token.decimals())
 
     def get(self, acct: "BaseAddress | AddressType | str") -> Decimal:
         """
@@ -119,7 +256,40 @@ class TokenBalances(ManagerAccessMixin):
         NOTE: Does **not** use cached value.
         """
 
-        return self.token.balanceOf(acct) / Decimal(10 ** self.token.decimals())
+        address = self.conversion_manager.convert(acct, AddressType)
+        return self.token.balanceOf(address) / self._scale
+
+    async def aget(self, acct: "BaseAddress | AddressType | str") -> Decimal:
+        """Awaitable version of `.get`, which does not block the event loop."""
+
+        # NOTE: Conversion (e.g. ENS) and `decimals` (on first use) may both block on the RPC
+        def prepare() -> tuple[AddressType, Decimal]:
+            return self.conversion_manager.convert(acct, AddressType), self._scale
+
+        address, scale = await run_async(prepare)
+        # NOTE: Batched together with any other concurrent reads (see `BatchExecutor`)
+        return await batch_executor.acall(self.token.balanceOf, address) / scale
+
+    def history(
+        self,
+        accounts: Iterable["BaseAddress | AddressType | str"] | None = None,
+        start_block: int = 0,
+        stop_block: int | None = None,
+        **page_kwargs,
+    ) -> BalanceHistory:
+        """
+        Reconstruct the balance history of this token from its Transfer logs.
+
+        See :meth:`~ape_tokens.history.BalanceHistory.from_logs` for details.
+        """
+
+        return BalanceHistory.from_logs(
+            self.token,
+            accounts=accounts,
+            start_block=start_block,
+            stop_block=stop_block,
+            **page_kwargs,
+        )
 
     def __getitem__(self, acct: "BaseAddress | AddressType | str") -> Decimal:
         """
@@ -130,60 +300,215 @@ class TokenBalances(ManagerAccessMixin):
         address = self.conversion_manager.convert(acct, AddressType)
 
         # NOTE: Don't update `self._balances` (only `.monitor` can)
-        if balance := self._balances.get(address):
-            return balance
+        if (raw_balance := self._balances.get(address)) is not None:
+            return raw_balance / self._scale
 
         return self.get(address)
 
-    def monitor(self, bot: "SilverbackBot", *addresses: AddressType):
-        from silverback.types import TaskType
+    def _metric_name(self, address: AddressType) -> str:
+        return f"{self.token.symbol()}/{address}"
 
-        if len(addresses) == 0:
-            raise ValueError("No addresses to monitor")
+    def _reset(self, address: AddressType, raw_balance: int, block_number: int):
+        """Set the base balance of ``address`` as of ``block_number`` (e.g. read from chain)."""
 
-        # Startup task: Load current balances for all watched addresses
-        async def load_balances(_):
-            if len(addresses) > 1:
-                from ape_ethereum import multicall
-                from ape_ethereum.multicall.exceptions import UnsupportedChainError
+        if (journal := self._journals.get(address)) is None:
+            journal = self._journals[address] = BalanceJournal()
 
-                try:
-                    call = multicall.Call()
-                except UnsupportedChainError:
-                    call = multicall.Call.inject()
+        journal.rebase(block_number)
+        journal.needs_reload = False
+        # NOTE: Keep any changes from later blocks that were already applied
+        self._balances[address] = raw_balance + journal.pending(block_number)
 
-                # NOTE: Should be fine to do only one loop for a reasonable # of addresses (<100)
-                for address in addresses:
-                    call.add(self.token.balanceOf, address)
+    def _record(self, address: AddressType, amount: int, log) -> bool:
+        if (journal := self._journals.get(address)) is None:
+            journal = self._journals[address] = BalanceJournal()
 
-                for address, raw_balance in zip(addresses, call(), strict=False):
-                    self._balances[address] = raw_balance / Decimal(10 ** self.token.decimals())
+        # NOTE: Reorg (`log.removed`) reverses the change, if it was applied
+        if (delta := journal.record(log.block_number, log.log_index, amount, log.removed)) is None:
+            return False
 
-            else:  # NOTE: Just call directly if only 1
-                self._balances[addresses[0]] = self.token.balanceOf(addresses[0]) / Decimal(
-                    10 ** self.token.decimals()
-                )
+        self._balances[address] += delta
+        return True
+
+    def _apply(self, address: AddressType, amount: int, log) -> dict[str, Decimal]:
+        if not self._record(address, amount, log):
+            return {}  # NOTE: Nothing changed
+
+        if self._block_metrics is not None:
+            # NOTE: Emitted once the block is complete instead (see `_install_metrics_flush`)
+            self._block_metrics.add(log.block_number, self, address)
+            return {}
+
+        # NOTE: Only convert to Decimal when emitting the metric
+        return {self._metric_name(address): self._balances[address] / self._scale}
+
+    def _balance_at(self, address: AddressType, block_number: int) -> int | None:
+        """
+        Get the raw balance of ``address`` as of the end of ``block_number`` (if tracked).
+
+        ```{note}
+        Changes from later blocks may already be applied, so they are subtracted back out.
+        ```
+        """
+
+        if (raw_balance := self._balances.get(address)) is None:
+            return None
+
+        elif journal := self._journals.get(address):
+            return raw_balance - journal.pending(block_number)
+
+        return raw_balance
+
+    def _checkpoint(self, block_number: int) -> dict[AddressType, int] | None:
+        """
+        Get raw balances as of the end of ``block_number`` (see ``_balance_at``), or ``None`` if
+        they are not all known as of then (e.g. a balance was read from chain at a later block).
+        """
+
+        if any(
+            journal.needs_reload or journal.base_block > block_number
+            for journal in self._journals.values()
+        ):
+            return None
+
+        return {
+            address: raw_balance - journal.pending(block_number)
+            if (journal := self._journals.get(address))
+            else raw_balance
+            for address, raw_balance in self._balances.items()
+        }
+
+    def _finalize(self, block_number: int) -> list[AddressType]:
+        """
+        Fold all changes up to ``block_number`` into the base balances.
+
+        Returns:
+            list[AddressType]: Addresses whose base balance was changed by a reorg, and so must
+            be read from chain again.
+        """
+
+        needs_reload = []
+        for address, journal in self._journals.items():
+            if journal.needs_reload:
+                needs_reload.append(address)
+
+            else:
+                journal.rebase(block_number)
+
+        return needs_reload
+
+    # NOTE: Logs are filtered by watched receiver (or sender), but the subscription may be shared
+    #       with the watchers of other tokens, which could watch other addresses
+    def _handle_acquisition(self, log) -> dict[str, Decimal]:
+        if log.receiver not in self._watched:
+            return {}
+
+        return self._apply(log.receiver, log.amount, log)
+
+    def _handle_disposition(self, log) -> dict[str, Decimal]:
+        if log.sender not in self._watched:
+            return {}
+
+        return self._apply(log.sender, -log.amount, log)
+
+    def _install_loader(self, bot: "SilverbackBot", *addresses: AddressType):
+        from silverback.types import TaskType
+
+        # Startup task: Load current balances for all watched addresses
+        async def load_balances(_):
+            await run_async(_load_balances, [self], addresses)
 
         # NOTE: Namespace the function to avoid conflicts
         load_balances.__name__ = f"tokens:{self.token.symbol()}:load-balances"
         bot.broker_task_decorator(TaskType.STARTUP)(load_balances)
 
+    def monitor(
+        self,
+        bot: "SilverbackBot",
+        *addresses: AddressType,
+        mode: MonitorMode = "address",
+        coalesce: bool = False,
+        finality_depth: int | None = None,
+    ):
+        """
+        Install the balance monitor for this token on a Silverback bot.
+
+        Args:
+            bot: The `silverback.SilverbackBot` instance to install monitoring on.
+            *addresses: The addresses to watch.
+            mode: How to subscribe to Transfer logs. ``"address"`` (the default) installs two
+              filtered subscriptions per address, while ``"token"`` installs two subscriptions
+              for all addresses at once (one filtered by sender, the other by receiver).
+            coalesce: Emit (at most) one metric per address per block, once the block is
+              complete, instead of one metric per Transfer log. Defaults to ``False``.
+            finality_depth: The number of blocks after which a change can no longer be reorged.
+              Defaults to the ``tokens.finality_depth`` config.
+        """
+        if len(addresses) == 0:
+            raise ValueError("No addresses to monitor")
+
+        elif mode not in ("address", "token"):
+            raise ValueError(f"Unsupported mode: '{mode}'")
+
+        self._install_loader(bot, *addresses)
+        _install_finalizer(
+            bot,
+            (self,),
+            addresses,
+            _get_finality_depth(finality_depth),
+            f"tokens:{self.token.symbol()}:finalize",
+        )
+
+        if coalesce:
+            self._block_metrics = BlockMetrics()
+            _install_metrics_flush(
+                bot, self._block_metrics, f"tokens:{self.token.symbol()}:metrics"
+            )
+
+        self._install_handlers(bot, *addresses, mode=mode)
+
+    def _install_handlers(
+        self,
+        bot: "SilverbackBot",
+        *addresses: AddressType,
+        mode: MonitorMode = "address",
+    ):
+        from silverback.types import TaskType
+
+        self._watched.update(addresses)
+
+        if mode == "token":
+            # NOTE: A list of values matches any of them, so O(1) filters cover every address
+
+            async def balances_acquired(log):
+                return self._handle_acquisition(log)
+
+            async def balances_disposed(log):
+                return self._handle_disposition(log)
+
+            # NOTE: Namespace the function to avoid conflicts, requires globally-unique name
+            balances_acquired.__name__ = f"tokens:{self.token.symbol()}:acquisitions"
+            bot.broker_task_decorator(
+                TaskType.EVENT_LOG,
+                container=self.token.Transfer,
+                filter_args=dict(receiver=list(addresses)),
+            )(balances_acquired)
+
+            balances_disposed.__name__ = f"tokens:{self.token.symbol()}:dispositions"
+            bot.broker_task_decorator(
+                TaskType.EVENT_LOG,
+                container=self.token.Transfer,
+                filter_args=dict(sender=list(addresses)),
+            )(balances_disposed)
+            return
+
         # Create individual event handlers per token per address
         # This improves efficiency by leveraging event filtering
         # NOTE: creates O(A) event filters, for O(T * A) total, but reduces total RPC sub events
-        # TODO: Once Ape supports OR filter args, use that to reduce to only O(1)
 
         def create_acquisition(address, handler_name):
             async def balance_acquired(log):
-                amount = Decimal(log.amount) / Decimal(10 ** self.token.decimals())
-
-                if log.removed:
-                    # Reorg: reverse the acquisition
-                    self._balances[address] -= amount
-                else:  # Normal: record acquisition
-                    self._balances[address] += amount
-
-                return {f"{self.token.symbol()}/{address}": self._balances[address]}
+                return self._apply(address, log.amount, log)
 
             # NOTE: Namespace the function to avoid conflicts, requires globally-unique name
             balance_acquired.__name__ = handler_name
@@ -195,15 +520,7 @@ class TokenBalances(ManagerAccessMixin):
 
         def create_disposition(address, handler_name):
             async def balance_disposed(log):
-                amount = Decimal(log.amount) / Decimal(10 ** self.token.decimals())
-
-                if log.removed:
-                    # Reorg: reverse the disposition (add back)
-                    self._balances[address] += amount
-                else:  # Normal: record disposition
-                    self._balances[address] -= amount
-
-                return {f"{self.token.symbol()}/{address}": self._balances[address]}
+                return self._apply(address, -log.amount, log)
 
             # NOTE: Namespace the function to avoid conflicts, requires globally-unique name
             balance_disposed.__name__ = handler_name
@@ -218,7 +535,471 @@ class TokenBalances(ManagerAccessMixin):
             create_disposition(address, f"tokens:{self.token.symbol()}:disposition{idx}")
 
 
-class BalanceManager(ManagerAccessMixin):
+def _install_metrics_flush(bot: "SilverbackBot", block_metrics: BlockMetrics, name: str):
+    from silverback.types import TaskType
+
+    # NOTE: Logs arrive in block order, so all blocks prior to a new block are complete
+    async def flush_metrics(block):
+        return block_metrics.flush(block.number)
+
+    # NOTE: Namespace the function to avoid conflicts
+    flush_metrics.__name__ = name
+    bot.broker_task_decorator(TaskType.NEW_BLOCK)(flush_metrics)
+
+
+def _get_finality_depth(finality_depth: int | None) -> int:
+    if finality_depth is None:
+        finality_depth = ManagerAccessMixin.config_manager.get_config("tokens").finality_depth
+
+    if finality_depth < 1:
+        raise ValueError("`finality_depth` must be at least 1 block.")
+
+    return finality_depth
+
+
+def _install_finalizer(
+    bot: "SilverbackBot",
+    token_balances: Sequence[TokenBalances],
+    addresses: Sequence[AddressType],
+    finality_depth: int,
+    name: str,
+):
+    from silverback.types import TaskType
+
+    async def finalize_balances(block):
+        to_reload = [tb for tb in token_balances if tb._finalize(block.number - finality_depth)]
+
+        if to_reload:
+            # NOTE: Reorg was deeper than the finality depth, so the journal can't reverse it
+            logger.warning(f"Reorg beyond finality depth, reloading {len(to_reload)} token(s).")
+            raw_balances = await run_async(
+                balances_of,
+                [tb.token for tb in to_reload],
+                addresses,
+                block_id=block.number,
+            )
+            # NOTE: Only read in a worker thread, since handlers update journals on the event loop
+            _reset_balances(to_reload, raw_balances, block.number)
+
+    # NOTE: Namespace the function to avoid conflicts
+    finalize_balances.__name__ = name
+    bot.broker_task_decorator(TaskType.NEW_BLOCK)(finalize_balances)
+
+
+def _load_balances(
+    token_balances: Iterable[TokenBalances],
+    addresses: Sequence[AddressType],
+    block_id: int | None = None,
+):
+    if block_id is None:
+        block_id = ManagerAccessMixin.chain_manager.blocks.height
+
+    # NOTE: All `balanceOf` calls are batched together, and made at the same block
+    token_balances = list(token_balances)
+    raw_balances = balances_of(
+        (tb.token for tb in token_balances),
+        addresses,
+        block_id=block_id,
+    )
+
+    _reset_balances(token_balances, raw_balances, block_id)
+
+
+def _reset_balances(
+    token_balances: Iterable[TokenBalances],
+    raw_balances: dict[AddressType, dict[AddressType, int]],
+    block_id: int,
+):
+    for tb in token_balances:
+        for address, raw_balance in raw_balances.get(tb.token.address, {}).items():
+            tb._reset(address, raw_balance, block_id)
+
+
+def _restore_balances(token_balances: Iterable[TokenBalances], addresses: Sequence[AddressType]):
+    """
+    Restore checkpointed balances, then replay the Transfer logs since each checkpoint.
+
+    Balances of accounts without a checkpoint (for that token) are loaded from chain instead.
+    """
+
+    chain_id = ManagerAccessMixin.provider.chain_id
+    head = ManagerAccessMixin.chain_manager.blocks.height
+
+    to_load: list[tuple[TokenBalances, AddressType]] = []
+    restored: dict[AddressType, TokenBalances] = dict()
+    start_block = head + 1
+    for tb in token_balances:
+        saved = balance_checkpoints.get(chain_id, tb.token.address)
+        for address in addresses:
+            # NOTE: Each account is restored as of its own checkpoint block
+            if (checkpoint := saved.get(address)) is None or checkpoint[0] > head:
+                to_load.append((tb, address))
+                continue
+
+            checkpoint_block, raw_balance = checkpoint
+            tb._reset(address, raw_balance, checkpoint_block)
+            start_block = min(start_block, checkpoint_block + 1)
+            restored[tb.token.address] = tb
+
+    if to_load:
+        # NOTE: Loaded first, so replayed logs up to `head` are ignored for these accounts
+        results = batch_call(
+            [(tb.token.balanceOf, (address,)) for tb, address in to_load],
+            block_id=head,
+        )
+        for (tb, address), raw_balance in zip(to_load, results, strict=True):
+            if isinstance(raw_balance, int):
+                tb._reset(address, raw_balance, head)
+
+    if restored and start_block <= head:
+        from ape.types import LogFilter
+
+        transfer_abi = Token.contract_type.events["Transfer"]
+        watched = set(addresses)
+        # NOTE: 1 query per direction, for all restored tokens at once
+        for search_topics in (dict(sender=addresses), dict(receiver=addresses)):
+            log_filter = LogFilter(
+                addresses=list(restored),
+                events=[transfer_abi],
+                # NOTE: Addresses are already checksummed, so encode directly
+                topic_filter=transfer_abi.encode_topics(search_topics),
+                start_block=start_block,
+                stop_block=head,
+            )
+
+            for log in ManagerAccessMixin.provider.get_contract_logs(log_filter):
+                tb = restored[log.contract_address]
+                for address, amount in ((log.sender, -log.amount), (log.receiver, log.amount)):
+                    # NOTE: Transfers between 2 watched addresses are found by both queries, and
+                    #       logs up to each checkpoint are ignored (see `BalanceJournal.record`)
+                    if address in watched and address in tb._balances:
+                        tb._record(address, amount, log)
+
+
+def _read_balances(
+    pairs: Sequence[tuple[TokenBalances, AddressType]],
+    lag: int,
+) -> tuple[int, list[int | None]]:
+    # NOTE: Logs of the latest block(s) may not be processed yet, so read a few blocks behind
+    block_id = max(ManagerAccessMixin.chain_manager.blocks.height - lag, 0)
+    # NOTE: All `balanceOf` calls are batched together, and made at the same block
+    results = batch_call([(tb.token.balanceOf, (address,)) for tb, address in pairs], block_id)
+    return block_id, [result if isinstance(result, int) else None for result in results]
+
+
+def _install_reconciler(
+    bot: "SilverbackBot",
+    token_balances: Sequence[TokenBalances],
+    addresses: Sequence[AddressType],
+    schedule: str,
+    budget: int | None,
+    lag: int,
+    finality_depth: int,
+):
+    from silverback.types import TaskType
+
+    pairs = [(tb, address) for tb in token_balances for address in addresses]
+    if budget is None or budget > len(pairs):
+        budget = len(pairs)
+
+    elif budget < 1:
+        raise ValueError("`reconcile_budget` must be at least 1 balance.")
+
+    # NOTE: Balances can only be compared as of blocks that are still in the journal
+    if not 0 <= lag < finality_depth:
+        raise ValueError("`reconcile_lag` must be at least 0, and less than `finality_depth`.")
+
+    cursor = 0
+
+    async def reconcile_balances(_):
+        nonlocal cursor
+
+        # NOTE: Sweep through all pairs over consecutive runs, `budget` at a time
+        sample = [pairs[(cursor + offset) % len(pairs)] for offset in range(budget)]
+        cursor = (cursor + budget) % len(pairs)
+
+        block_id, raw_balances = await run_async(_read_balances, sample, lag)
+
+        metrics: dict[str, Decimal] = dict()
+        for (tb, address), raw_balance in zip(sample, raw_balances, strict=True):
+            if raw_balance is None:
+                continue  # NOTE: Failed to read, so check again next sweep
+
+            elif (journal := tb._journals.get(address)) and journal.base_block > block_id:
+                continue  # NOTE: Already read from chain (or restored) as of a later block
+
+            elif raw_balance == (cached_balance := tb._balance_at(address, block_id)):
+                continue
+
+            elif cached_balance is not None:
+                drift = raw_balance - cached_balance
+                logger.debug(f"Balance of {address} drifted by {drift} (raw) {tb.token.symbol()}")
+                metrics[f"{tb._metric_name(address)}/drift"] = drift / tb._scale
+
+            # NOTE: Also ignores any (late) logs up to `block_id`, since the read includes them
+            tb._reset(address, raw_balance, block_id)
+            metrics[tb._metric_name(address)] = tb._balances[address] / tb._scale
+
+        return metrics
+
+    # NOTE: Namespace the function to avoid conflicts
+    reconcile_balances.__name__ = "tokens:reconcile"
+    bot.broker_task_decorator(TaskType.CRON_JOB, cron_schedule=schedule)(reconcile_balances)
+
+
+def _install_checkpoint(
+    bot: "SilverbackBot",
+    token_balances: Sequence[TokenBalances],
+    finality_depth: int,
+):
+    from silverback.types import TaskType
+
+    # NOTE: Raw balances as of the last checkpoint, so only changed balances are written
+    last_saved: dict[AddressType, dict[AddressType, int]] = dict()
+
+    async def save_checkpoint(block):
+        # NOTE: Only final balances are saved, so a reorg (e.g. while the bot is down) can never
+        #       leave behind a checkpoint of orphaned blocks
+        checkpoint_block = block.number - finality_depth
+
+        # NOTE: Collect balances on the event loop (where handlers update them), then write
+        accounts: list[tuple[AddressType, AddressType]] = []
+        changed: list[tuple[AddressType, AddressType, int]] = []
+        for tb in token_balances:
+            if (balances := tb._checkpoint(checkpoint_block)) is None:
+                continue  # NOTE: Not final yet, so keep the previous checkpoint
+
+            accounts.extend((tb.token.address, address) for address in balances)
+            saved = last_saved.get(tb.token.address, {})
+            changed.extend(
+                (tb.token.address, address, raw_balance)
+                for address, raw_balance in balances.items()
+                if saved.get(address) != raw_balance
+            )
+            last_saved[tb.token.address] = balances
+
+        if accounts:
+            await run_async(
+                balance_checkpoints.save,
+                ManagerAccessMixin.provider.chain_id,
+                checkpoint_block,
+                accounts,
+                changed,
+            )
+
+    # NOTE: Namespace the function to avoid conflicts
+    save_checkpoint.__name__ = "tokens:checkpoint"
+    bot.broker_task_decorator(TaskType.NEW_BLOCK)(save_checkpoint)
+
+
+class _BaseSnapshot(ManagerAccessMixin):
+    def __init__(self, tokens: tuple[TokenInstance, ...], block_id: int):
+        self.tokens = tokens
+        self.block_id = block_id
+
+        self._tokens_by_address = {token.address: token for token in tokens}
+
+    def _get_token(self, token: ConvertsToToken) -> TokenInstance:
+        if isinstance(token, TokenInstance):
+            address = token.address
+
+        elif token in self._tokens_by_address:
+            address = cast(AddressType, token)
+
+        else:  # NOTE: Symbol (or non-checksummed address)
+            address = self.conversion_manager.convert(token, AddressType)
+
+        if not (token_instance := self._tokens_by_address.get(address)):
+            raise KeyError(f"Token {token} is not in snapshot")
+
+        return token_instance
+
+
+class BalanceSnapshot(_BaseSnapshot):
+    """
+    Table of token balances for a set of accounts, all read at the same block.
+
+    Usage example::
+
+        >>> snapshot = balances.snapshot(accounts, tokens=["USDC", "DAI"])
+        >>> snapshot["USDC"][account]
+        Decimal('100.5')
+        >>> snapshot["DAI", account]
+        Decimal('0')
+
+    ```{note}
+    Balances are stored in raw (integer) form, and only converted to Decimal when read.
+    ```
+    """
+
+    def __init__(
+        self,
+        tokens: tuple[TokenInstance, ...],
+        accounts: tuple[AddressType, ...],
+        raw_balances: dict[AddressType, dict[AddressType, int]],
+        block_id: int,
+    ):
+        super().__init__(tokens, block_id)
+        self.accounts = accounts
+
+        self._raw_balances = raw_balances
+
+    def __repr__(self) -> str:
+        cls_name = self.__class__.__name__
+        return (
+            f"<{cls_name} tokens={len(self.tokens)} "
+            f"accounts={len(self.accounts)} block={self.block_id}>"
+        )
+
+    def raw(self, token: ConvertsToToken, account: "BaseAddress | AddressType | str") -> int:
+        """
+        Get the raw (integer) balance of ``account`` for ``token``.
+
+        Raises:
+            KeyError: If the balance was not able to be read, or is not in the snapshot.
+        """
+
+        token_address = self._get_token(token).address
+        account = self.conversion_manager.convert(account, AddressType)
+        return self._raw_balances[token_address][account]
+
+    def __getitem__(self, key) -> Decimal | dict[AddressType, Decimal]:
+        if isinstance(key, tuple):
+            token, account = key
+            token_instance = self._get_token(token)
+            return self.raw(token_instance, account) / Decimal(10 ** token_instance.decimals())
+
+        token_instance = self._get_token(key)
+        scale = Decimal(10 ** token_instance.decimals())
+        return {
+            account: raw_balance / scale
+            for account, raw_balance in self._raw_balances.get(token_instance.address, {}).items()
+        }
+
+
+class _BaseTokenReaders(ManagerAccessMixin, Generic[ReaderT]):
+    """
+    Per-token readers (by token address) of a manager, for the given tokens, or for every token
+    of the default tokenlist (whose readers are only created when they are first used).
+    """
+
+    _reader_cls: type[ReaderT]
+
+    def __init__(self, *tokens: ConvertsToToken):
+        # NOTE: Only set when using the default tokenlist, which is loaded lazily
+        self._tokens_manager: TokenManager | None = None
+
+        if not tokens:
+            # Use default tokenlist
+            from .main import tokens as tokens_manager
+
+            self._tokens_manager = tokens_manager
+
+        # NOTE: This is **only** to be updated by Silverback in `.monitor`
+        #       (or by `__getitem__`, when lazily loading from the default tokenlist)
+        self._readers: dict[AddressType, ReaderT] = {
+            token.address: self._reader_cls(token) for token in self._to_tokens(tokens)
+        }
+
+    def __repr__(self) -> str:
+        cls_name = self.__class__.__name__
+        return f"<{cls_name} tokens={len(self)}>"
+
+    def __len__(self) -> int:
+        if self._tokens_manager is not None:
+            return len(self._tokens_manager._index)
+
+        return len(self._readers)
+
+    def __iter__(self) -> Iterator[ReaderT]:
+        """
+        Iterate over the readers of all configured tokens.
+
+        ```{note}
+        When using the default tokenlist, readers are created as needed (and not stored).
+        ```
+        """
+
+        if self._tokens_manager is None:
+            yield from self._readers.values()
+            return
+
+        for record in self._tokens_manager._index:
+            if reader := self._readers.get(record.address):
+                yield reader
+
+            else:
+                yield self._reader_cls(TokenInstance.from_tokeninfo(record))
+
+    def __getitem__(self, token: ConvertsToToken) -> ReaderT:
+        """Get the reader for a token by address, symbol, or contract instance."""
+
+        if isinstance(token, TokenInstance):
+            address = token.address
+
+        else:
+            address = self.conversion_manager.convert(token, AddressType)
+
+        if reader := self._readers.get(address):
+            return reader
+
+        elif self._tokens_manager is not None and (
+            record := self._tokens_manager._index.get_by_address(address)
+        ):
+            # NOTE: Create on first access, when lazily loading from the default tokenlist
+            reader = self._readers[address] = self._reader_cls(TokenInstance.from_tokeninfo(record))
+            return reader
+
+        raise KeyError(f"Not watching {token}")
+
+    def get(self, token: ConvertsToToken) -> ReaderT | None:
+        """
+        Get the reader for a token by address, symbol, or contract instance.
+
+        If not configured (or not in tokenlist), returns `None`.
+        """
+
+        try:
+            return self[token]
+
+        except KeyError:
+            return None
+
+    def _to_tokens(self, tokens: Iterable[ConvertsToToken]) -> tuple[TokenInstance, ...]:
+        return tuple(
+            (
+                Token.at(self.conversion_manager.convert(t, AddressType))
+                if not isinstance(t, TokenInstance)
+                else t
+            )
+            for t in tokens
+        )
+
+    def _snapshot_tokens(
+        self, tokens: Iterable[ConvertsToToken] | None
+    ) -> tuple[TokenInstance, ...]:
+        # NOTE: Defaults to all configured tokens
+        return tuple(reader.token for reader in self) if tokens is None else self._to_tokens(tokens)
+
+    def _store_all(self):
+        if self._tokens_manager is not None:
+            # NOTE: Monitoring needs every token, so store all of them now
+            for reader in self:
+                self._readers.setdefault(reader.token.address, reader)
+
+    def _watched_addresses(
+        self,
+        bot: "SilverbackBot",
+        accounts: Iterable["BaseAddress | AddressType | str"],
+    ) -> list[AddressType]:
+        # NOTE: Includes `bot.signer` (if one is configured)
+        return [
+            *([bot.signer.address] if bot.signer else []),
+            *(self.conversion_manager.convert(a, AddressType) for a in accounts),
+        ]
+
+
+class BalanceManager(_BaseTokenReaders[TokenBalances]):
     """
     Fetch token balances in Decimal format for a given set of tokens.
 
@@ -268,6 +1049,8 @@ class BalanceManager(ManagerAccessMixin):
         ...     usdc.transfer(address, "100 USDC", sender=bot.signer)
     """
 
+    _reader_cls = TokenBalances
+
     def __init__(self, *tokens: ConvertsToToken):
         """
         Initialize a BalanceManager for one or more tokens (defaults to configured tokenlist).
@@ -283,66 +1066,113 @@ class BalanceManager(ManagerAccessMixin):
         ```
         """
 
-        if tokens:
-            tokens = tuple(
-                (
-                    Token.at(self.conversion_manager.convert(t, AddressType))
-                    if not isinstance(t, TokenInstance)
-                    else t
-                )
-                for t in tokens
-            )
-
-        else:
-            # Use default tokenlist
-            from .main import tokens as tokens_manager
+        super().__init__(*tokens)
 
-            tokens = tuple(tokens_manager)
+    @classmethod
+    def discover(
+        cls,
+        accounts: Iterable["BaseAddress | AddressType | str"],
+        start_block: int = 0,
+        stop_block: int | None = None,
+        **discover_kwargs,
+    ) -> "BalanceManager":
+        """
+        Create a manager of only the tokens that ``accounts`` sent or received, found from
+        their Transfer logs between ``start_block`` and ``stop_block``.
 
-        # NOTE: This is **only** to be updated by Silverback in `.monitor`
-        self._token_balances: dict[AddressType, TokenBalances] = {
-            token: TokenBalances(token) for token in cast(tuple[TokenInstance], tokens)
-        }
+        See :func:`~ape_tokens.discovery.iter_discovered_tokens` for details.
 
-    def __repr__(self) -> str:
-        cls_name = self.__class__.__name__
-        return f"<{cls_name} tokens={len(self._token_balances)}>"
+        Raises:
+            ValueError: If the accounts did not transfer any tokens in that range.
+        """
+        from .discovery import iter_discovered_tokens
 
-    def __getitem__(self, token: ConvertsToToken) -> TokenBalances:
-        """Get token balance reader for token by address, symbol, or contract instance."""
+        if not (
+            tokens := list(
+                iter_discovered_tokens(
+                    accounts,
+                    start_block=start_block,
+                    stop_block=stop_block,
+                    **discover_kwargs,
+                )
+            )
+        ):
+            # NOTE: No tokens would mean using the default tokenlist instead
+            raise ValueError("No tokens found for accounts.")
 
-        if not isinstance(token, TokenInstance):
-            token = Token.at(self.conversion_manager.convert(token, AddressType))
+        return cls(*tokens)
 
-        if not (balances := self._token_balances.get(token)):
-            raise KeyError(f"Not watching {token}")
+    def get_balance(
+        self,
+        token: ConvertsToToken,
+        account: "BaseAddress | AddressType | str",
+    ) -> Decimal:
+        return self[token][account]
 
-        return balances
+    async def aget_balance(
+        self,
+        token: ConvertsToToken,
+        account: "BaseAddress | AddressType | str",
+    ) -> Decimal:
+        """Awaitable version of `.get_balance`, which does not block the event loop."""
+        return await run_async(self.get_balance, token, account)
 
-    def get(self, token: ConvertsToToken) -> TokenBalances | None:
+    def snapshot(
+        self,
+        accounts: Iterable["BaseAddress | AddressType | str"],
+        tokens: Iterable[ConvertsToToken] | None = None,
+        block_id: int | None = None,
+    ) -> "BalanceSnapshot":
         """
-        Get token balance reader for token by address, symbol, or contract instance.
+        Get on-chain balances of many tokens for many accounts, all at the same block.
 
-        If not configured (or not in tokenlist), returns `None`.
+        ```{note}
+        Uses batched multicalls, instead of one ``balanceOf`` call per token per account.
+        ```
+
+        Args:
+            accounts: The accounts to get the balances of.
+            tokens: The tokens to get the balances of, by address, symbol, or contract instance.
+                Defaults to all tokens configured in this manager.
+            block_id: The block to get the balances at. Defaults to the current head.
+
+        Returns:
+            :class:`~ape_tokens.managers.BalanceSnapshot`
         """
 
-        try:
-            return self.__getitem__(token)
+        if block_id is None:
+            block_id = self.chain_manager.blocks.height
 
-        except KeyError:
-            return None
+        token_instances = self._snapshot_tokens(tokens)
+        addresses = tuple(self.conversion_manager.convert(a, AddressType) for a in accounts)
 
-    def get_balance(
+        return BalanceSnapshot(
+            token_instances,
+            addresses,
+            balances_of(token_instances, addresses, block_id=block_id),
+            block_id,
+        )
+
+    async def asnapshot(
         self,
-        token: ConvertsToToken,
-        account: "BaseAddress | AddressType | str",
-    ) -> Decimal:
-        return self[token][account]
+        accounts: Iterable["BaseAddress | AddressType | str"],
+        tokens: Iterable[ConvertsToToken] | None = None,
+        block_id: int | None = None,
+    ) -> "BalanceSnapshot":
+        """Awaitable version of `.snapshot`, which does not block the event loop."""
+        return await run_async(self.snapshot, accounts, tokens=tokens, block_id=block_id)
 
     def monitor(
         self,
         bot: "SilverbackBot",
         *accounts: "BaseAddress | AddressType | str",
+        mode: MonitorMode = "address",
+        coalesce: bool = False,
+        checkpoint: bool = False,
+        finality_depth: int | None = None,
+        reconcile: str | None = None,
+        reconcile_budget: int | None = None,
+        reconcile_lag: int = 1,
     ):
         """
         Install the balance monitor on a Silverback bot, for all configured tokens.
@@ -359,24 +1189,100 @@ class BalanceManager(ManagerAccessMixin):
         Args:
             bot: The `silverback.SilverbackBot` instance to install monitoring on.
             *accounts: Other accounts to watch. Includes `bot.signer`. (if one is configured)
+            mode: How to subscribe to Transfer logs (defaults to ``"address"``):
+
+              - ``"address"``: 2 filtered subscriptions per token per account.
+              - ``"token"``: 2 subscriptions per token, filtered by all accounts at once.
+
+            coalesce: Emit (at most) one metric per token per account per block, once the block
+              is complete, instead of one metric per Transfer log. This reduces metric volume
+              for busy accounts, and avoids triggering on intermediate balances within a block.
+              Defaults to ``False``.
+            checkpoint: Persist all monitored balances after every block (as of the last final
+              block, see ``finality_depth``), so that the next time the bot starts, it restores
+              them and only replays the Transfer logs since then (instead of reading every
+              balance from chain). Only used on live networks. Defaults to ``False``.
+            finality_depth: The number of blocks after which a change can no longer be reorged.
+              Changes are journaled until then, so that reorgs (and redelivered logs) are handled
+              exactly, and a reorg any deeper reloads the affected balances from chain.
+              Defaults to the ``tokens.finality_depth`` config.
+            reconcile: A cron schedule (e.g. ``"*/5 * * * *"``) to compare monitored balances with
+              on-chain balances on, fixing any drift (e.g. of rebasing or fee-on-transfer tokens,
+              whose balances don't follow their Transfer logs). Each correction also emits a
+              ``"{symbol}/{address}/drift"`` metric. Defaults to never reconciling.
+            reconcile_budget: The maximum number of balances to read (in one batched multicall)
+              per reconciliation, sweeping through all monitored balances over consecutive runs.
+              Defaults to all monitored balances at once.
+            reconcile_lag: The number of blocks behind the head to read balances at, so that the
+              Transfer logs of the latest blocks (which may not be processed yet) are not
+              mistaken for drift. Must be less than ``finality_depth``. Defaults to ``1``.
 
         ```{important}
         This method registers multiple event handlers with the bot to track Transfer events
-        for the specified tokens and maintain up-to-date balance information. It is recommended
-        **not** to install the monitor for too many accounts and tokens at once, as it creates
-        `2 * (# of tokens) * (# of accounts)` event log filters, which could dramatically increase
-        your RPC utilization and/or exceed hosted service limits in practice.
+        for the specified tokens and maintain up-to-date balance information. In the default
+        ``"address"`` mode, it creates `2 * (# of tokens) * (# of accounts)` event log filters,
+        which could dramatically increase your RPC utilization and/or exceed hosted service limits
+        in practice. The ``"token"`` mode filters by all accounts at once instead, for
+        `2 * (# of tokens)` filters in total, which still only deliver the Transfer logs of
+        watched accounts.
         ```
         """
-        if not (
-            addresses := [
-                *([bot.signer.address] if bot.signer else []),
-                *map(lambda a: self.conversion_manager.convert(a, AddressType), accounts),
-            ]
-        ):
+        if not (addresses := self._watched_addresses(bot, accounts)):
             raise ValueError(
                 "Must either provide a set of accounts to watch, or enable `bot.signer`."
             )
 
-        for token_balances in self._token_balances.values():
-            token_balances.monitor(bot, *addresses)
+        elif mode not in ("address", "token"):
+            raise ValueError(f"Unsupported mode: '{mode}'")
+
+        from silverback.types import TaskType
+
+        self._store_all()
+
+        finality_depth = _get_finality_depth(finality_depth)
+        use_checkpoint = checkpoint and balance_checkpoints.enabled
+
+        # Startup task: Load current balances of all tokens for all watched addresses at once
+        async def load_balances(_):
+            if use_checkpoint:
+                await run_async(_restore_balances, self._readers.values(), addresses)
+
+            else:
+                await run_async(_load_balances, self._readers.values(), addresses)
+
+        # NOTE: Namespace the function to avoid conflicts
+        load_balances.__name__ = "tokens:load-balances"
+        bot.broker_task_decorator(TaskType.STARTUP)(load_balances)
+
+        _install_finalizer(
+            bot,
+            tuple(self._readers.values()),
+            addresses,
+            finality_depth,
+            "tokens:finalize",
+        )
+
+        if use_checkpoint:
+            _install_checkpoint(bot, tuple(self._readers.values()), finality_depth)
+
+        if reconcile is not None:
+            _install_reconciler(
+                bot,
+                tuple(self._readers.values()),
+                addresses,
+                reconcile,
+                reconcile_budget,
+                reconcile_lag,
+                finality_depth,
+            )
+
+        if coalesce:
+            # NOTE: Shared by all tokens, so only 1 flush task is needed
+            block_metrics = BlockMetrics()
+            _install_metrics_flush(bot, block_metrics, "tokens:metrics")
+
+            for token_balances in self._readers.values():
+                token_balances._block_metrics = block_metrics
+
+        for token_balances in self._readers.values():
+            token_balances._install_handlers(bot, *addresses, mode=mode)
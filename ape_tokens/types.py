@@ -6,9 +6,13 @@ from ape.utils.misc import log_instead_of_fail
 from eth_pydantic_types import HexBytes
 from eth_utils import to_checksum_address
 
+from .cache import METADATA_FIELDS, instance_cache, metadata_cache
+
 if TYPE_CHECKING:
     from tokenlists import TokenInfo
 
+    from .index import TokenRecord
+
 
 ERC20 = ContractType.model_validate(
     {
@@ -111,6 +115,13 @@ ERC20 = ContractType.model_validate(
 )
 
 
+def _get_cached_metadata(address: AddressType) -> dict[str, Any]:
+    if not metadata_cache.enabled:
+        return {}
+
+    return metadata_cache.get(metadata_cache.provider.chain_id, address)
+
+
 class ImmutableCallHandler(ContractCallHandler):
     # TODO: Should this move upstream into Ape as `ImmutableCallHandler`?
     _cached_value: Any
@@ -121,6 +132,15 @@ class ImmutableCallHandler(ContractCallHandler):
             if not hasattr(self, "_cached_value"):
                 self._cached_value = super().__call__(*args, **kwargs)
 
+                if metadata_cache.enabled:
+                    # NOTE: Persist first on-chain read, so no other process has to repeat it
+                    metadata_cache.set(
+                        self.provider.chain_id,
+                        self.contract.address,
+                        self.abis[0].name,
+                        self._cached_value,
+                    )
+
             return self._cached_value
 
         elif self._cached_raw_value is None:
@@ -132,6 +152,10 @@ class ImmutableCallHandler(ContractCallHandler):
 class TokenInstance(ContractInstance):
     # NOTE: Subclass this so that we don't create a breaking interface (still is a ContractInstance)
 
+    # NOTE: Only `False` for tokens built without proxy detection (see `from_tokeninfo`)
+    _proxy_resolved: bool = True
+    _resolved_instance: ContractInstance | None = None
+
     @log_instead_of_fail(default="<TokenInstance>")
     def __repr__(self) -> str:
         res = f"{self.address}"
@@ -143,26 +167,82 @@ class TokenInstance(ContractInstance):
 
         return f"<{res}>"
 
+    def __getattr__(self, attr_name: str) -> Any:
+        try:
+            return super().__getattr__(attr_name)
+
+        except AttributeError:
+            if self._proxy_resolved or attr_name.startswith("_"):
+                raise
+
+        # NOTE: Not part of the ERC20 ABI, so it might be on the implementation (e.g. USDC)
+        return getattr(self._resolve_proxy(), attr_name)
+
+    def _resolve_proxy(self) -> ContractInstance:
+        if self._resolved_instance is None:
+            self._resolved_instance = self.chain_manager.contracts.instance_at(
+                self.address,
+                contract_type=ERC20,
+                # NOTE: Use default setting for proxy detection as we don't
+                #       know if token is proxy (e.g. USDC)
+            )
+
+        return self._resolved_instance
+
     @classmethod
-    def from_tokeninfo(cls, token_info: "TokenInfo"):
-        contract_instance = cls.chain_manager.contracts.instance_at(
-            to_checksum_address(token_info.address),
-            contract_type=ERC20,
-            # NOTE: Use default setting for proxy detection as we don't
-            #       know if token is proxy (e.g. USDC)
-        )
+    def from_tokeninfo(
+        cls,
+        token_info: "TokenInfo | TokenRecord",
+        detect_proxy: bool | None = None,
+    ):
+        """
+        Create a token instance from a tokenlist entry.
+
+        Args:
+            token_info (TokenInfo | TokenRecord): The tokenlist entry of the token.
+            detect_proxy (bool | None): Whether to detect if the token is a proxy up front,
+              which costs several RPC requests. Defaults to the ``tokens.detect_proxy`` config.
+              When disabled, no network requests are made until the token is used, and the proxy
+              is only resolved if a method not in the ERC20 ABI is accessed.
+        """
+
+        address = to_checksum_address(token_info.address)
+        if (interned := instance_cache.get(address)) is not None:
+            return interned
+
+        if detect_proxy is None:
+            detect_proxy = cls.config_manager.get_config("tokens").detect_proxy
+
+        if detect_proxy:
+            contract_instance = cls.chain_manager.contracts.instance_at(
+                address,
+                contract_type=ERC20,
+                # NOTE: Use default setting for proxy detection as we don't
+                #       know if token is proxy (e.g. USDC)
+            )
+
+        else:
+            # NOTE: Tokenlist address is already known to be an ERC20, so skip all network I/O
+            contract_instance = ContractInstance(address, contract_type=ERC20)
+
+        # NOTE: Prefer values previously read on-chain over tokenlist values
+        cached_metadata = _get_cached_metadata(contract_instance.address)
 
         # NOTE: Patch all of our "immutable" fields with caching call handler subclass
-        for field in ("name", "symbol", "decimals"):
+        for field in METADATA_FIELDS:
             method = contract_instance._view_methods_[field]
             method.__class__ = ImmutableCallHandler
             method.__doc__ = f"""The {field} of the token (sourced from 'py-tokenlists')"""
-            method._cached_value = getattr(token_info, field)
+            method._cached_value = cached_metadata.get(field, getattr(token_info, field))
             contract_instance._view_methods_[field] = method
 
         # NOTE: Inject class for custom repr/class instancing
         contract_instance.__class__ = cls
 
+        if not detect_proxy:
+            contract_instance._proxy_resolved = False
+
+        instance_cache.put(contract_instance)
         return contract_instance
 
 
@@ -170,19 +250,32 @@ class TokenContainer(ContractContainer):
     def __init__(self):
         super().__init__(ERC20)
 
-    def at(self, *args, **kwargs) -> TokenInstance:
-        contract_instance = super().at(*args, **kwargs)
+    def at(self, address: AddressType, *args, **kwargs) -> TokenInstance:
+        address = to_checksum_address(address)
+
+        # NOTE: Only intern plain lookups (e.g. not when given a custom `proxy_info=`)
+        if is_plain_lookup := not (args or kwargs):
+            if (interned := instance_cache.get(address)) is not None:
+                return interned
+
+        contract_instance = super().at(address, *args, **kwargs)
+        cached_metadata = _get_cached_metadata(contract_instance.address)
 
         # NOTE: Patch all of our "immutable" fields with caching call handler subclass
-        for field in ("name", "symbol", "decimals"):
+        for field in METADATA_FIELDS:
             method = contract_instance._view_methods_[field]
             method.__class__ = ImmutableCallHandler
             method.__doc__ = f"""The {field} of the token (sourced from 'py-tokenlists')"""
+            if field in cached_metadata:
+                method._cached_value = cached_metadata[field]  # type: ignore[attr-defined]
             contract_instance._view_methods_[field] = method
 
         # NOTE: Inject class for custom repr/class instancing
         contract_instance.__class__ = TokenInstance
 
+        if is_plain_lookup:
+            instance_cache.put(cast(TokenInstance, contract_instance))
+
         return cast(TokenInstance, contract_instance)
 
 
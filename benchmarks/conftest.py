@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+
+import pytest
+from ape.utils import ManagerAccessMixin
+from eth_utils import to_checksum_address
+from tokenlists import TokenInfo, TokenList
+
+from ape_tokens import Token
+from ape_tokens.index import IndexedTokenListManager
+from ape_tokens.managers import TokenManager
+from ape_tokens.testing import MockERC20
+
+# NOTE: Every synthetic token is tagged with one of these
+TAGS = ("stablecoin", "wrapped", "governance")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--tokenlist-size",
+        type=int,
+        default=1_000,
+        help="Number of tokens in the synthetic tokenlist used by benchmarks.",
+    )
+
+
+@pytest.fixture(scope="session")
+def tokenlist_size(request) -> int:
+    return request.config.getoption("--tokenlist-size")
+
+
+@pytest.fixture
+def owner(accounts):
+    return accounts[0]
+
+
+@pytest.fixture
+def mock_token(owner):
+    mock = MockERC20.deploy(owner, "Test token", "TEST", 6, sender=owner)
+    return Token.at(mock.address)
+
+
+@pytest.fixture
+def tokenlist(chain, mock_token, tokenlist_size) -> TokenList:
+    tokens = [
+        TokenInfo(
+            chainId=chain.chain_id,
+            address=mock_token.address,
+            name="Test token",
+            symbol="TEST",
+            decimals=6,
+            tags=[TAGS[0]],
+        )
+    ]
+    tokens.extend(
+        TokenInfo(
+            chainId=chain.chain_id,
+            address=to_checksum_address(f"0x{idx:040x}"),
+            name=f"Synthetic token {idx}",
+            symbol=f"TKN{idx}",
+            decimals=18,
+            tags=[TAGS[idx % len(TAGS)]],
+        )
+        for idx in range(1, tokenlist_size)
+    )
+
+    return TokenList(
+        name="Benchmark",
+        timestamp=datetime.now(timezone.utc),
+        version=dict(major=1, minor=0, patch=0),
+        tags={tag: dict(name=tag, description=f"{tag} tokens") for tag in TAGS},
+        tokens=tokens,
+    )
+
+
+@pytest.fixture(autouse=True)
+def tokenlist_manager(monkeypatch, tokenlist) -> IndexedTokenListManager:
+    # NOTE: Only kept in memory, so nothing is fetched from (or written to) the tokenlist cache
+    manager = IndexedTokenListManager()
+    manager.installed_tokenlists[tokenlist.name] = tokenlist
+    manager.default_tokenlist = tokenlist.name
+
+    monkeypatch.setattr(TokenManager, "_manager", manager)
+
+    # NOTE: Registered converters may have already cached their own manager (e.g. during deploy)
+    for converter_name in ("TokenAmount", "TokenSymbol"):
+        converter = ManagerAccessMixin.conversion_manager.get_converter(converter_name)
+        monkeypatch.setitem(converter.__dict__, "manager", manager)
+
+    return manager
+
+
+# NOTE: Use the registered instances (importing `ape_tokens.converters` early shadows the
+#       plugin's `converters` hook, so the converters would never get registered)
+@pytest.fixture
+def amount_converter(tokenlist_manager):
+    return ManagerAccessMixin.conversion_manager.get_converter("TokenAmount")
+
+
+@pytest.fixture
+def symbol_converter(tokenlist_manager):
+    return ManagerAccessMixin.conversion_manager.get_converter("TokenSymbol")
+
+
+class StubBot:
+    """Collects tasks registered by `BalanceManager.monitor`, in place of a `SilverbackBot`"""
+
+    signer = None
+
+    def __init__(self):
+        self.tasks = []
+
+    def broker_task_decorator(self, task_type, container=None, filter_args=None, **kwargs):
+        def add_task(handler):
+            self.tasks.append((task_type, handler, container, filter_args))
+            return handler
+
+        return add_task
+
+    def handlers(self, task_type):
+        return [handler for tt, handler, *_ in self.tasks if tt == task_type]
+
+
+@pytest.fixture
+def bot():
+    return StubBot()
@@ -0,0 +1,62 @@
+import pytest
+from silverback.types import TaskType
+
+from ape_tokens import BalanceManager, Token
+
+
+def run_handler(handler, log):
+    # NOTE: Handlers never await, so drive the coroutine directly (avoids event loop overhead)
+    try:
+        handler(log).send(None)
+    except StopIteration as result:
+        return result.value
+
+
+def test_construct_default(benchmark, tokenlist):
+    def construct():
+        balances = BalanceManager()
+        return len(balances), balances["TEST"]
+
+    num_tokens, _ = benchmark(construct)
+    assert num_tokens == len(tokenlist.tokens)
+
+
+def test_construct_from_symbols(benchmark, tokenlist):
+    symbols = [token_info.symbol for token_info in tokenlist.tokens[:100]]
+    balances = benchmark(BalanceManager, *symbols)
+    assert len(balances) == len(symbols)
+
+
+@pytest.mark.parametrize("mode", ["address", "token"])
+def test_monitor_throughput(benchmark, mode, bot, owner, accounts, mock_token):
+    mock_token.mint(owner, 10**8, sender=owner)
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], mode=mode)
+
+    tx = mock_token.transfer(accounts[1], 10**6, sender=owner)
+    (log,) = Token.Transfer.from_receipt(tx)
+
+    # NOTE: This log only reaches the handlers filtered by its sender or receiver
+    #       (a list of values is an OR)
+    handlers = [
+        handler
+        for task_type, handler, _, filter_args in bot.tasks
+        if task_type == TaskType.EVENT_LOG
+        and all(
+            log.event_arguments[k] in (v if isinstance(v, list) else [v])
+            for k, v in (filter_args or {}).items()
+        )
+    ]
+
+    # NOTE: Instead of running the startup task (only interested in event handlers)
+    balances[mock_token]._balances.update({owner.address: 10**8, accounts[1].address: 0})
+
+    def process():
+        # NOTE: Otherwise the log is ignored after the first round, since it was already applied
+        balances[mock_token]._journals.clear()
+        metrics = {}
+        for handler in handlers:
+            metrics.update(run_handler(handler, log))
+        return metrics
+
+    assert len(benchmark(process)) == 2
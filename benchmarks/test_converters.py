@@ -0,0 +1,31 @@
+import pytest
+
+
+@pytest.fixture
+def symbol(tokenlist):
+    return tokenlist.tokens[-1].symbol
+
+
+def test_symbol_is_convertible(benchmark, symbol_converter, symbol):
+    assert benchmark(symbol_converter.is_convertible, symbol)
+
+
+def test_symbol_is_not_convertible(benchmark, symbol_converter):
+    assert not benchmark(symbol_converter.is_convertible, "NOT_A_TOKEN")
+
+
+def test_symbol_convert(benchmark, symbol_converter, tokenlist, symbol):
+    assert benchmark(symbol_converter.convert, symbol) == tokenlist.tokens[-1].address
+
+
+def test_amount_is_convertible(benchmark, amount_converter, symbol):
+    assert benchmark(amount_converter.is_convertible, f"1.5 {symbol}")
+
+
+def test_amount_convert(benchmark, amount_converter, symbol):
+    assert benchmark(amount_converter.convert, f"1.5 {symbol}") == 15 * 10**17
+
+
+def test_amount_convert_many(benchmark, amount_converter, tokenlist):
+    values = [f"{idx}.5 {token_info.symbol}" for idx, token_info in enumerate(tokenlist.tokens)]
+    assert len(benchmark(amount_converter.convert_many, values)) == len(values)
@@ -0,0 +1,25 @@
+import pytest
+
+from ape_tokens import tokens
+
+
+@pytest.mark.parametrize("key", ["symbol", "lower", "address"])
+def test_getitem(benchmark, tokenlist, key):
+    token_info = tokenlist.tokens[-1]
+    symbol_or_address = dict(
+        symbol=token_info.symbol,
+        lower=token_info.symbol.lower(),
+        address=token_info.address.lower(),
+    )[key]
+
+    token = benchmark(tokens.__getitem__, symbol_or_address)
+    assert token.address == token_info.address
+
+
+def test_filter_all(benchmark, tokenlist):
+    assert len(benchmark(list, tokens)) == len(tokenlist.tokens)
+
+
+def test_filter_tags(benchmark, tokenlist):
+    tagged = benchmark(lambda: list(tokens.filter(tags={"stablecoin"})))
+    assert 0 < len(tagged) < len(tokenlist.tokens)
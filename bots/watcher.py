@@ -15,21 +15,19 @@ balances = BalanceManager(TOKEN)  # NOTE: use the default tokenlist by omitting
 # Monitor balance updates for specific account(s), using above configured tokens
 # NOTE: 0xaA8b...3efb is kraken's USDT hot wallet, so monitor will be very active
 ADDRESS = os.environ.get("ADDRESS", "0xaA8ba7D4611437141192e7ceCed531Bc0A133efb")
-balances.monitor(bot, ADDRESS)  # NOTE: can monitor more accounts by adding more `*addresses` here
+# NOTE: `coalesce=True` emits 1 metric per block (with the balance at the end of that block), so
+#       `refill` below does not react to intermediate balances from a block with many transfers
+# NOTE: `reconcile` compares the cache with on-chain balances every minute (in a single multicall),
+#       fixing any drift and emitting a `f"{SYMBOL}/{ADDRESS}/drift"` metric when it does
+balances.monitor(
+    bot,
+    ADDRESS,  # NOTE: can monitor more accounts via `*addresses`
+    coalesce=True,
+    reconcile="* * * * *",
+)
 # NOTE: `balances.monitor(bot)` will just track the bot's signer address
 
 
-@bot.cron("* * * * *")
-async def check(_):
-    # NOTE: Metric value may temporarily mismatch on-chain if multiple balance updates occur in
-    #       the same block, so take care to double-check the answer if it is critical to operation
-    #       see: https://github.com/ApeWorX/silverback/issues/290
-    cached_balance = balances[TOKEN][ADDRESS]
-    onchain_balance = TOKEN.balanceOf(ADDRESS) / Decimal(10 ** TOKEN.decimals())
-
-    assert not (diff := cached_balance - onchain_balance), f"Cache mismatched by {diff} {SYMBOL}"
-
-
 if bot.signer:
     # NOTE: Will never happen in practice, but a good demo for how to use balance metrics
     @bot.on_metric(f"{SYMBOL}/{ADDRESS}", lt=Decimal(100))
@@ -1,7 +1,107 @@
+import asyncio
+
 import pytest
+from ape.contracts import ContractContainer
 from click.testing import CliRunner
+from ethpm_types import ContractType
+from silverback.types import TaskType
+
+from ape_tokens import Token
+from ape_tokens.testing import MockERC20
 
 
 @pytest.fixture
 def runner():
     return CliRunner()
+
+
+@pytest.fixture
+def owner(accounts):
+    return accounts[0]
+
+
+@pytest.fixture
+def mock_token(owner):
+    mock = MockERC20.deploy(owner, "Test token", "TEST", 6, sender=owner)
+    return Token.at(mock.address)
+
+
+# NOTE: Emits an ERC721 `Transfer(caller, caller, 1)` on every call (all 3 arguments indexed)
+MOCK_ERC721 = ContractContainer(
+    ContractType(
+        contractName="MockERC721",
+        abi=[],
+        deploymentBytecode={
+            "bytecode": (
+                # NOTE: Return the runtime code (below) as the contract's code
+                "0x602b600c600039602b6000f3"
+                # NOTE: `LOG4` with no data, then `STOP`
+                "600133337f"
+                "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+                "60006000a400"
+            )
+        },
+    )
+)
+
+
+@pytest.fixture
+def mock_nft(owner):
+    return owner.deploy(MOCK_ERC721)
+
+
+class StubBot:
+    """Collects tasks registered by `BalanceManager.monitor`, in place of a `SilverbackBot`"""
+
+    signer = None
+
+    def __init__(self):
+        self.tasks = []
+
+    def broker_task_decorator(self, task_type, container=None, filter_args=None, **kwargs):
+        def add_task(handler):
+            self.tasks.append((task_type, handler, container, filter_args))
+            return handler
+
+        return add_task
+
+    def handlers(self, task_type):
+        return [handler for tt, handler, *_ in self.tasks if tt == task_type]
+
+    def startup(self):
+        for handler in self.handlers(TaskType.STARTUP):
+            asyncio.run(handler(None))
+
+    def process_log(self, log) -> dict:
+        # NOTE: Emulate the RPC subscription's filtering of logs (a list of values is an OR)
+        metrics = {}
+        for task_type, handler, container, filter_args in self.tasks:
+            if task_type != TaskType.EVENT_LOG:
+                continue
+
+            # NOTE: `ContractEventWrapper` has no `.contract`, but all its events share one
+            event = getattr(container, "events", [container])[-1]
+            if (address := getattr(event.contract, "address", None)) and (
+                address != log.contract_address
+            ):
+                continue
+
+            elif all(
+                log.event_arguments[k] in (v if isinstance(v, list) else [v])
+                for k, v in (filter_args or {}).items()
+            ):
+                metrics.update(asyncio.run(handler(log)))
+
+        return metrics
+
+    def process_block(self, block) -> dict:
+        metrics: dict = {}
+        for handler in self.handlers(TaskType.NEW_BLOCK):
+            metrics.update(asyncio.run(handler(block)) or {})
+
+        return metrics
+
+
+@pytest.fixture
+def bot():
+    return StubBot()
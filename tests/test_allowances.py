@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from silverback.types import TaskType
+
+from ape_tokens import AllowanceManager, Token
+
+
+def test_allowance_snapshot(owner, accounts, mock_token):
+    mock_token.approve(accounts[2], 5 * 10**6, sender=owner)
+    mock_token.approve(accounts[3], 10**6, sender=accounts[1])
+    allowances = AllowanceManager(mock_token)
+
+    snapshot = allowances.snapshot([owner, accounts[1]], [accounts[2], accounts[3]])
+    assert snapshot[mock_token.address, owner, accounts[2]] == Decimal(5)
+    assert snapshot.raw(mock_token, accounts[1], accounts[2]) == 0
+    assert len(snapshot[mock_token]) == 4
+    assert [(owner, spender) for _, owner, spender, _ in snapshot.nonzero()] == [
+        (owner.address, accounts[2].address),
+        (accounts[1].address, accounts[3].address),
+    ]
+
+    assert allowances.get_allowance(mock_token, owner, accounts[2]) == Decimal(5)
+
+
+def test_monitor_approvals(bot, owner, accounts, mock_token):
+    mock_token.approve(accounts[2], 5 * 10**6, sender=owner)
+    allowances = AllowanceManager(mock_token)
+    allowances.monitor(bot, owner, spenders=[accounts[2]])
+    # NOTE: 1 subscription per token, filtered by all owners at once
+    (filter_args,) = [args for tt, _, _, args in bot.tasks if tt == TaskType.EVENT_LOG]
+    assert filter_args == dict(owner=[owner.address])
+
+    bot.startup()
+    assert allowances[mock_token]._allowances == {(owner.address, accounts[2].address): 5 * 10**6}
+
+    tx = mock_token.approve(accounts[2], 10**6, sender=owner)
+    (log,) = Token.Approval.from_receipt(tx)
+    assert bot.process_log(log) == {f"TEST/{owner.address}/{accounts[2].address}": Decimal(1)}
+    assert allowances[mock_token][owner, accounts[2]] == Decimal(1)
+
+    # NOTE: Neither the owner nor the spender are watched
+    tx = mock_token.approve(accounts[3], 10**6, sender=owner)
+    (log,) = Token.Approval.from_receipt(tx)
+    assert bot.process_log(log) == {}
+
+    # Reorg: log is removed, so the allowance is read from chain again
+    allowances[mock_token]._allowances[(owner.address, accounts[2].address)] = 0
+    tx = mock_token.approve(accounts[2], 3 * 10**6, sender=owner)
+    (log,) = Token.Approval.from_receipt(tx)
+    bot.process_log(log.model_copy(update=dict(removed=True)))
+    assert allowances[mock_token][owner, accounts[2]] == Decimal(3)
+
+
+def test_allowances_default_tokenlist_is_lazy(monkeypatch, bot, chain, owner, mock_token):
+    from tokenlists import TokenInfo
+
+    from ape_tokens import tokens
+    from ape_tokens.index import TokenIndex
+
+    token_info = TokenInfo(
+        chainId=chain.chain_id,
+        address=mock_token.address,
+        name="Test token",
+        symbol="TEST",
+        decimals=6,
+    )
+    # NOTE: Avoids installing the default tokenlist(s)
+    monkeypatch.setattr(type(tokens), "_index", TokenIndex([token_info]))
+
+    allowances = AllowanceManager()
+    assert repr(allowances) == "<AllowanceManager tokens=1>"
+    assert allowances._readers == {}  # NOTE: Nothing loaded until first access
+
+    assert [ta.token.address for ta in allowances] == [mock_token.address]
+    assert allowances._readers == {}  # NOTE: Iterating does not store readers
+
+    assert allowances[mock_token.address] is allowances[mock_token]
+    assert list(allowances._readers) == [mock_token.address]
+
+    # NOTE: Monitoring stores (and watches) every token
+    allowances = AllowanceManager()
+    allowances.monitor(bot, owner)
+    assert list(allowances._readers) == [mock_token.address]
+    assert len(bot.handlers(TaskType.EVENT_LOG)) == 1
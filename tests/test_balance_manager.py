@@ -1,3 +1,7 @@
+import asyncio
+import threading
+from decimal import Decimal
+
 import pytest
 from ape.utils import ZERO_ADDRESS
 
@@ -27,3 +31,86 @@ def test_balances_getter_vs_onchain():
 
     balances = BalanceManager(usdt := tokens["USDT"])
     assert usdt.balanceOf(ZERO_ADDRESS) == balances["USDT"][ZERO_ADDRESS] * 10 ** usdt.decimals()
+
+
+def test_balances_snapshot(owner, accounts, mock_token):
+    mock_token.mint(accounts[1], 5 * 10**6, sender=owner)
+    block_id = mock_token.chain_manager.blocks.height
+    mock_token.mint(accounts[1], 10**6, sender=owner)  # NOTE: After snapshot block
+
+    balances = BalanceManager(mock_token)
+    snapshot = balances.snapshot([owner, accounts[1]], block_id=block_id)
+    assert snapshot.block_id == block_id
+
+    assert snapshot[mock_token] == {owner.address: Decimal(0), accounts[1].address: Decimal(5)}
+    assert snapshot[mock_token.address, accounts[1]] == Decimal(5)
+    assert snapshot.raw(mock_token, accounts[1]) == 5 * 10**6
+
+    with pytest.raises(KeyError):
+        snapshot[ZERO_ADDRESS]
+
+
+def test_balances_default_tokenlist_is_lazy(monkeypatch, chain, mock_token):
+    from tokenlists import TokenInfo
+
+    from ape_tokens import tokens
+    from ape_tokens.index import TokenIndex
+
+    token_info = TokenInfo(
+        chainId=chain.chain_id,
+        address=mock_token.address,
+        name="Test token",
+        symbol="TEST",
+        decimals=6,
+    )
+    # NOTE: Avoids installing the default tokenlist(s)
+    monkeypatch.setattr(type(tokens), "_index", TokenIndex([token_info]))
+
+    balances = BalanceManager()
+    assert repr(balances) == "<BalanceManager tokens=1>"
+    assert balances._readers == {}  # NOTE: Nothing loaded until first access
+
+    assert [tb.token.address for tb in balances] == [mock_token.address]
+    assert balances._readers == {}  # NOTE: Iterating does not store readers
+
+    assert balances[mock_token.address] is balances[mock_token]
+    assert list(balances._readers) == [mock_token.address]
+
+    with pytest.raises(KeyError):
+        balances[ZERO_ADDRESS]
+
+
+def test_balances_async(monkeypatch, owner, accounts, mock_token):
+    from ape_tokens import tokens
+    from ape_tokens.index import TokenIndex
+
+    # NOTE: Avoids installing the default tokenlist(s)
+    monkeypatch.setattr(type(tokens), "_index", TokenIndex([]))
+
+    mock_token.mint(accounts[1], 5 * 10**6, sender=owner)
+    balances = BalanceManager(mock_token)
+
+    # NOTE: Conversion may resolve ENS names, so it must not run on the event loop
+    converter = type(balances.conversion_manager)
+    convert, convert_threads = converter.convert, set()
+
+    def record_convert(self, value, to_type):
+        convert_threads.add(threading.current_thread())
+        return convert(self, value, to_type)
+
+    monkeypatch.setattr(converter, "convert", record_convert)
+
+    async def read_all():
+        return await asyncio.gather(
+            tokens.aget(mock_token.address),
+            balances.aget_balance(mock_token, accounts[1]),
+            balances[mock_token].aget(owner),
+            balances.asnapshot([owner, accounts[1]]),
+        )
+
+    token, balance, owner_balance, snapshot = asyncio.run(read_all())
+    assert convert_threads and threading.main_thread() not in convert_threads
+    assert token.address == mock_token.address
+    assert balance == Decimal(5)
+    assert owner_balance == Decimal(0)
+    assert snapshot[mock_token, accounts[1]] == Decimal(5)
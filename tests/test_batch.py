@@ -0,0 +1,69 @@
+from ape_tokens.batch import BatchExecutor, _new_multicall, balances_of, batch_call
+
+
+def test_batch_call(owner, accounts, mock_token):
+    for idx, account in enumerate(accounts[:5]):
+        mock_token.mint(account, idx, sender=owner)
+
+    block_id = mock_token.chain_manager.blocks.height
+    mock_token.mint(owner, 100, sender=owner)  # NOTE: After pinned block
+
+    calls = [(mock_token.balanceOf, (account,)) for account in accounts[:5]]
+    assert batch_call(calls, block_id=block_id, batch_size=2) == list(range(5))
+
+
+def test_batch_call_unpinned(monkeypatch, owner, accounts, mock_token):
+    mock_token.mint(accounts[1], 10, sender=owner)
+    blocks = mock_token.chain_manager.blocks
+    height_lookups = []
+
+    def record_height(self):
+        height_lookups.append(True)
+        return height.fget(self)
+
+    height = type(blocks).height
+    monkeypatch.setattr(type(blocks), "height", property(record_height))
+
+    # NOTE: Nothing to keep consistent if everything fits in a single request
+    assert batch_call([(mock_token.balanceOf, (accounts[1],))]) == [10]
+    calls = [(mock_token.balanceOf, (account,)) for account in accounts[:3]]
+    if _new_multicall() is not None:
+        assert batch_call(calls) == [0, 10, 0]
+
+    assert not height_lookups
+
+    # NOTE: Spread over multiple requests (or individual calls, without Multicall3)
+    assert batch_call(calls, batch_size=2) == [0, 10, 0]
+    assert len(height_lookups) == 1
+
+
+def test_balances_of(owner, accounts, mock_token):
+    mock_token.mint(accounts[1], 10, sender=owner)
+    assert balances_of([mock_token], [owner.address, accounts[1].address]) == {
+        mock_token.address: {owner.address: 0, accounts[1].address: 10},
+    }
+
+
+def test_batch_executor(monkeypatch, owner, accounts, mock_token):
+    for idx, account in enumerate(accounts[:3]):
+        mock_token.mint(account, idx, sender=owner)
+
+    batches = []
+
+    def record_batch(calls, **kwargs):
+        batches.append(len(calls))
+        return batch_call(calls, **kwargs)
+
+    monkeypatch.setattr("ape_tokens.batch.batch_call", record_batch)
+    executor = BatchExecutor(max_batch_size=3, max_delay=60)
+
+    # NOTE: Executed as soon as the batch is full, instead of waiting for `max_delay`
+    futures = [executor.submit(mock_token.balanceOf, account) for account in accounts[:3]]
+    assert [future.result(timeout=10) for future in futures] == [0, 1, 2]
+
+    futures = [executor.submit(mock_token.balanceOf, account) for account in accounts[1:3]]
+    assert len(executor) == 2
+    executor.flush()
+    assert [future.result(timeout=10) for future in futures] == [1, 2]
+
+    assert batches == [3, 2]
@@ -0,0 +1,118 @@
+import pytest
+
+from ape_tokens import Token
+from ape_tokens.cache import LookupMissCache, TokenMetadataCache, instance_cache
+
+
+@pytest.fixture
+def metadata_cache(tmp_path, monkeypatch):
+    cache = TokenMetadataCache(path=tmp_path / "metadata.db")
+    # NOTE: Disabled on local networks by default
+    monkeypatch.setattr(TokenMetadataCache, "enabled", True)
+    monkeypatch.setattr("ape_tokens.types.metadata_cache", cache)
+    return cache
+
+
+def test_metadata_cache(metadata_cache):
+    assert metadata_cache.get(1, "0x01") == {}
+
+    metadata_cache.set(1, "0x01", "decimals", 6)
+    metadata_cache.set(1, "0x01", "symbol", "USDC")
+    assert metadata_cache.get(1, "0x01") == {"decimals": 6, "symbol": "USDC"}
+    assert metadata_cache.get(2, "0x01") == {}
+
+    with pytest.raises(ValueError):
+        metadata_cache.set(1, "0x01", "balanceOf", 1)
+
+
+def test_token_at_uses_metadata_cache(metadata_cache, chain, mock_token):
+    assert metadata_cache.get(chain.chain_id, mock_token.address) == {}
+
+    # NOTE: First on-chain read fills the cache
+    assert mock_token.decimals() == 6
+    assert metadata_cache.get(chain.chain_id, mock_token.address) == {"decimals": 6}
+
+    # NOTE: New instances (e.g. in another process) read the cache first
+    metadata_cache.set(chain.chain_id, mock_token.address, "symbol", "CACHED")
+    instance_cache.clear()
+    assert Token.at(mock_token.address).symbol() == "CACHED"
+
+
+def test_token_instances_are_interned(monkeypatch, mock_token):
+    # NOTE: Disabled on local networks by default
+    monkeypatch.setattr(type(instance_cache), "enabled", True)
+    mock_token = Token.at(mock_token.address)
+
+    assert Token.at(mock_token.address) is mock_token
+    assert Token.at(mock_token.address.lower()) is mock_token
+
+    instance_cache.clear()
+    assert Token.at(mock_token.address) is not mock_token
+
+
+def test_lookup_miss_cache(monkeypatch):
+    cache = LookupMissCache(maxsize=2, ttl=10)
+    cache.add("A", generation=1)
+    cache.add("B", generation=1)
+    assert cache.is_miss("A", generation=1)
+
+    cache.add("C", generation=1)  # NOTE: Evicts "B" (least recently used)
+    assert not cache.is_miss("B", generation=1)
+    assert len(cache) == 2
+
+    monkeypatch.setattr("time.monotonic", lambda: float("inf"))
+    assert not cache.is_miss("A", generation=1)  # NOTE: Expired
+
+    cache.add("A", generation=1)
+    assert not cache.is_miss("A", generation=2)  # NOTE: New generation clears everything
+    assert len(cache) == 0
+
+
+def test_token_manager_caches_misses(monkeypatch, mock_token):
+    from ape.utils import ManagerAccessMixin
+
+    from ape_tokens import tokens
+    from ape_tokens.index import TokenIndex
+
+    # NOTE: Avoids installing the default tokenlist(s)
+    monkeypatch.setattr(type(tokens), "_index", TokenIndex([]))
+    monkeypatch.setattr("ape_tokens.managers.lookup_misses", LookupMissCache())
+
+    lookups = []
+    conversion_manager = ManagerAccessMixin.conversion_manager
+    convert = conversion_manager.convert
+
+    def counting_convert(value, to_type):
+        lookups.append(value)
+        return convert(value, to_type)
+
+    monkeypatch.setattr(conversion_manager, "convert", counting_convert)
+
+    assert "NOTATOKEN" not in tokens
+    assert tokens.get("NOTATOKEN") is None
+    assert lookups == ["NOTATOKEN"]  # NOTE: Second lookup is served by the cache
+
+    # NOTE: Hits are never cached as misses
+    assert mock_token.address in tokens
+    assert mock_token.address in tokens
+    assert lookups.count(mock_token.address) > 1
+
+    # NOTE: Installing (or removing) a tokenlist rebuilds the index, which invalidates misses
+    monkeypatch.setattr(type(tokens), "_index", TokenIndex([]))
+    assert "NOTATOKEN" not in tokens
+    assert lookups.count("NOTATOKEN") == 2
+
+
+def test_token_manager_without_tokenlist(monkeypatch, mock_token):
+    from ape_tokens import tokens
+
+    def no_default_tokenlist(self):
+        raise ValueError("Default token list has not been set.")
+
+    monkeypatch.setattr(type(tokens), "_index", property(no_default_tokenlist))
+    monkeypatch.setattr("ape_tokens.managers.lookup_misses", LookupMissCache())
+
+    # NOTE: Falls back to loading by address
+    assert tokens[mock_token.address].address == mock_token.address
+    assert mock_token.address in tokens
+    assert tokens.get("NOTATOKEN") is None
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+import pytest
+from ape.exceptions import ConversionError
+from ape.utils import ManagerAccessMixin
+from tokenlists import TokenInfo, TokenList
+
+from ape_tokens.index import IndexedTokenListManager
+
+
+@pytest.mark.parametrize(
+    "amount,raw_amount",
+    [
+        ("123.45", 123_450_000),
+        ("1", 10**6),
+        (".5", 500_000),
+        ("2.", 2 * 10**6),
+        ("-1.000001", -1_000_001),
+        ("1e2", 100 * 10**6),  # NOTE: Parsed by `Decimal`
+        ("1.5E-6", None),
+        ("1.0000001", None),
+        ("1.0000000", 10**6),  # NOTE: Trailing zeros are exact
+        ("1.50000000", 1_500_000),
+        ("one", None),
+        ("NaN", None),
+    ],
+)
+def test_parse_amount(amount, raw_amount):
+    # NOTE: Importing `ape_tokens.converters` before plugins are registered would shadow the
+    #       plugin's `converters` hook (so the converters would never get registered)
+    from ape_tokens.converters import parse_amount
+
+    if raw_amount is None:
+        with pytest.raises(ConversionError):
+            parse_amount(amount, 6)
+
+    else:
+        assert parse_amount(amount, 6) == raw_amount
+
+
+@pytest.fixture
+def conversion_manager():
+    return ManagerAccessMixin.conversion_manager
+
+
+@pytest.fixture
+def amount_converter(monkeypatch, tmp_path, chain, conversion_manager, mock_token):
+    monkeypatch.setattr("tokenlists.config.DEFAULT_CACHE_PATH", tmp_path)
+    manager = IndexedTokenListManager()
+    # NOTE: Only kept in memory, so nothing is written to the tokenlist cache
+    manager.installed_tokenlists["Test"] = TokenList(
+        name="Test",
+        timestamp=datetime.now(timezone.utc),
+        version=dict(major=1, minor=0, patch=0),
+        tokens=[
+            TokenInfo(
+                chainId=chain.chain_id,
+                address=mock_token.address,
+                name="Test token",
+                symbol="TEST",
+                decimals=6,
+            )
+        ],
+    )
+    manager.default_tokenlist = "Test"
+
+    # NOTE: Use the registered instance (so `conversion_manager.convert` uses it too)
+    converter = conversion_manager.get_converter("TokenAmount")
+    monkeypatch.setitem(converter.__dict__, "manager", manager)
+    return converter
+
+
+def test_amount_converter(amount_converter, conversion_manager):
+    assert amount_converter.is_convertible("123.45 TEST")
+    assert not amount_converter.is_convertible("123.45 TEST extra")
+    assert not amount_converter.is_convertible("123.45 NOPE")
+    assert amount_converter.convert("123.45 TEST") == 123_450_000
+
+    assert conversion_manager.convert("0.5 TEST", int) == 500_000
+    with pytest.raises(ConversionError):
+        conversion_manager.convert("0.0000001 TEST", int)
+
+
+def test_amount_convert_many(amount_converter):
+    assert amount_converter.convert_many(["1 TEST", "2.5 TEST", "0.000001 TEST"]) == [
+        10**6,
+        2_500_000,
+        1,
+    ]
+
+    with pytest.raises(ConversionError):
+        amount_converter.convert_many(["1 TEST", "1 NOPE"])
@@ -0,0 +1,36 @@
+import pytest
+
+from ape_tokens import BalanceManager
+from ape_tokens.discovery import iter_discovered_tokens, resolve_tokens
+from ape_tokens.testing import MockERC20
+
+
+def test_discover_tokens(chain, owner, accounts, mock_token, mock_nft):
+    other_token = MockERC20.deploy(owner, "Other token", "OTHER", 18, sender=owner)
+    untouched_token = MockERC20.deploy(owner, "Untouched token", "NOPE", 18, sender=owner)
+    start_block = chain.blocks.height
+
+    mock_token.mint(accounts[1], 10**6, sender=owner)
+    other_token.mint(owner, 10**18, sender=owner)
+    other_token.transfer(accounts[1], 10**18, sender=owner)
+    mock_token.transfer(accounts[2], 10**6, sender=accounts[1])
+    untouched_token.mint(accounts[2], 10**18, sender=owner)
+    accounts[1].transfer(mock_nft, 0)  # NOTE: Not a token, so skipped
+
+    tokens = list(iter_discovered_tokens([accounts[1]], start_block=start_block, batch_size=1))
+    assert [token.address for token in tokens] == [mock_token.address, other_token.address]
+    assert [token.symbol() for token in tokens] == ["TEST", "OTHER"]
+
+    balances = BalanceManager.discover([accounts[1]], start_block=start_block)
+    assert len(balances) == 2
+    assert balances[other_token][accounts[1]] == 1
+
+    with pytest.raises(ValueError):
+        BalanceManager.discover([accounts[3]], start_block=start_block)
+
+
+def test_resolve_tokens_skips_non_tokens(owner, mock_token):
+    # NOTE: Not a contract, so it has no `decimals`
+    assert [token.address for token in resolve_tokens([mock_token.address, owner.address])] == [
+        mock_token.address
+    ]
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+
+from ape_tokens.history import BalanceHistory, iter_transfer_logs
+
+
+@pytest.fixture
+def transfers(owner, accounts, mock_token):
+    blocks = []
+    for receipt in (
+        mock_token.mint(owner, 10 * 10**6, sender=owner),
+        mock_token.transfer(accounts[1], 3 * 10**6, sender=owner),
+        mock_token.transfer(accounts[2], 10**6, sender=accounts[1]),
+        mock_token.transfer(owner, 10**6, sender=accounts[1]),
+    ):
+        blocks.append(receipt.block_number)
+
+    return blocks
+
+
+def test_iter_transfer_logs(chain, accounts, mock_token, transfers):
+    # NOTE: Tiny pages, so paging is exercised
+    logs = list(iter_transfer_logs(mock_token, 0, chain.blocks.height, page_size=1))
+    assert [log.block_number for log in logs] == transfers
+
+    logs = list(
+        iter_transfer_logs(mock_token, 0, chain.blocks.height, accounts=[accounts[2].address])
+    )
+    assert [log.block_number for log in logs] == transfers[2:3]
+
+
+def test_iter_transfer_logs_skips_nfts(chain, owner, mock_token, mock_nft, transfers):
+    # NOTE: Shares the Transfer signature, but can't be decoded as an ERC20 Transfer
+    nft_block = owner.transfer(mock_nft, 0).block_number
+
+    logs = list(iter_transfer_logs(None, 0, chain.blocks.height, accounts=[owner.address]))
+    assert nft_block not in [log.block_number for log in logs]
+    assert {log.contract_address for log in logs} == {mock_token.address}
+
+
+def test_balance_history(chain, owner, accounts, mock_token, transfers):
+    history = BalanceHistory.from_logs(mock_token)
+    assert history.accounts >= {owner.address, accounts[1].address, accounts[2].address}
+
+    for block_number in range(transfers[0] - 1, chain.blocks.height + 1):
+        for account in (owner, accounts[1], accounts[2]):
+            assert history.raw_balance_at(account.address, block_number) == mock_token.balanceOf(
+                account, block_id=block_number
+            )
+
+    assert history.balance_at(owner.address, transfers[1]) == Decimal(7)
+    assert [change.amount for change in history.changes(accounts[1].address)] == [
+        3 * 10**6,
+        -(10**6),
+        -(10**6),
+    ]
+
+
+def test_balance_history_from_block(owner, accounts, mock_token, transfers):
+    history = BalanceHistory.from_logs(mock_token, accounts=[accounts[1]], start_block=transfers[2])
+    assert history.raw_balance_at(accounts[1].address, transfers[2] - 1) == 3 * 10**6
+    assert history.raw_balance_at(accounts[1].address, transfers[3]) == 10**6
+    assert len(list(history.changes())) == 2
+
+    with pytest.raises(ValueError):
+        history.balance_at(accounts[1].address, transfers[2] - 2)
+
+    with pytest.raises(KeyError):
+        history.balance_at(owner.address, transfers[3])
+
+    with pytest.raises(ValueError):
+        BalanceHistory.from_logs(mock_token, start_block=transfers[2])
@@ -0,0 +1,222 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from tokenlists import TokenInfo, TokenList, TokenListManager
+
+from ape_tokens.config import ListInfo
+from ape_tokens.index import IndexedTokenListManager, TokenIndex, TokenRecord
+
+USDC = TokenInfo(
+    chainId=1,
+    address="0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
+    name="USD Coin",
+    symbol="USDC",
+    decimals=6,
+)
+DAI = TokenInfo(
+    chainId=1,
+    address="0x6B175474E89094C44Da98b954EedeAC495271d0F",
+    name="Dai Stablecoin",
+    symbol="DAI",
+    decimals=18,
+)
+
+
+def test_token_record():
+    token_info = USDC.model_copy(
+        update=dict(address=USDC.address.lower(), logoURI="https://example.com/usdc.png")
+    )
+    record = TokenRecord(token_info)
+    assert not hasattr(record, "__dict__")
+    assert len(record.address_bytes) == 20
+    assert record.address == USDC.address  # NOTE: Always checksummed
+
+    assert record.to_tokeninfo(1) == token_info.model_copy(update=dict(address=USDC.address))
+    # NOTE: Symbols are interned, so records share them
+    assert record.symbol is TokenRecord(USDC).symbol
+
+
+def test_index_lookup():
+    index = TokenIndex([USDC, DAI])
+    assert len(index) == 2
+    assert "USDC" in index
+    assert "usdc" not in index  # NOTE: Membership is exact (used by converters)
+
+    assert index.get_token_info("USDC") == USDC
+    assert index.get_token_info("usdc") == USDC
+    assert index.get_token_info(USDC.address.lower()) == USDC
+    assert index.get_token_info(DAI.address.lower()) == DAI
+
+    with pytest.raises(ValueError):
+        index.get_token_info("WETH")
+
+
+def test_index_ambiguous_symbol():
+    fake_usdc = USDC.model_copy(update=dict(address="0x" + "01" * 20))
+    index = TokenIndex([USDC, fake_usdc])
+
+    with pytest.raises(ValueError):
+        index.get_token_info("USDC")
+
+    # NOTE: Still available by address
+    assert index.get_token_info(fake_usdc.address) == fake_usdc
+
+
+def test_index_filter_by_tags():
+    stable_usdc = USDC.model_copy(update=dict(tags=["stablecoin"]))
+    stable_dai = DAI.model_copy(update=dict(tags=["stablecoin", "governance"]))
+    untagged = USDC.model_copy(update=dict(address="0x" + "01" * 20, symbol="FAKE"))
+    index = TokenIndex([stable_usdc, stable_dai, untagged], tag_ids=["stablecoin", "governance"])
+    assert len(index) == 3
+    assert index.by_tag == {"stablecoin": {0, 1}, "governance": {1}}
+
+    def filtered(tags=None):
+        return [record.to_tokeninfo(1) for record in index.filter(tags)]
+
+    assert filtered() == [stable_usdc, stable_dai, untagged]
+    # NOTE: Only tokens with no tags outside of the filter
+    assert filtered({"stablecoin"}) == [stable_usdc, untagged]
+    assert filtered({"stablecoin", "governance"}) == [stable_usdc, stable_dai, untagged]
+    # NOTE: Tags not defined by the tokenlist are ignored
+    assert filtered({"governance", "unknown"}) == [untagged]
+
+
+def make_tokenlist(name, tokens, patch=0):
+    return TokenList(
+        name=name,
+        timestamp=datetime.now(timezone.utc),
+        version=dict(major=1, minor=0, patch=patch),
+        tokens=tokens,
+    )
+
+
+def test_install_required_in_background(monkeypatch, tmp_path):
+    monkeypatch.setattr("tokenlists.config.DEFAULT_CACHE_PATH", tmp_path)
+    monkeypatch.setattr("tokenlists.config.DEFAULT_TOKENLIST", "")
+    tmp_path.joinpath("Local.json").write_text(make_tokenlist("Local", [USDC]).model_dump_json())
+
+    # NOTE: Stands in for downloading the list (without writing it to disk)
+    remote_lists = {"local.uri": make_tokenlist("Local", [USDC]), "remote.uri": None}
+    downloads = []
+    release_remote = threading.Event()
+
+    def install_tokenlist(self, uri):
+        downloads.append(uri)
+        if uri == "remote.uri":
+            release_remote.wait(timeout=10)
+            remote_lists[uri] = make_tokenlist("Remote", [DAI])
+
+        self.installed_tokenlists[remote_lists[uri].name] = remote_lists[uri]
+        return remote_lists[uri].name
+
+    monkeypatch.setattr(TokenListManager, "install_tokenlist", install_tokenlist)
+    required = [ListInfo(name="Local", uri="local.uri"), ListInfo(name="Remote", uri="remote.uri")]
+
+    manager = IndexedTokenListManager()
+    assert list(manager.install_required(required)) == ["Remote"]
+    assert manager.install_required(required) == {}  # NOTE: Already installing
+    manager.set_default_tokenlist("Remote")
+
+    # NOTE: Installed list is usable while the other one is still downloading
+    local_index = manager.get_index(1, "Local")
+    assert local_index.get_token_info("USDC") == USDC
+    assert downloads == ["remote.uri"]
+
+    # NOTE: Only saved to disk once installed
+    assert not tmp_path.joinpath(".default").exists()
+
+    release_remote.set()
+    assert manager.get_index(1).get_token_info("DAI") == DAI  # NOTE: Waits for the download
+    assert tmp_path.joinpath(".default").read_text() == "Remote"
+
+    # NOTE: Stale lists are downloaded again, but the same version keeps its index
+    manager.install_required(required[:1], refresh_interval=0)["Local"].result()
+    assert downloads == ["remote.uri", "local.uri"]
+    assert manager.get_index(1, "Local") is local_index
+
+    # NOTE: Lists written to the cache folder are read from there when needed
+    assert list(manager.installed_tokenlists._in_memory) == ["Remote"]
+    assert manager.get_tokenlist("Local").tokens == [USDC]
+
+
+def test_install_required_retries_failures(monkeypatch, tmp_path):
+    monkeypatch.setattr("tokenlists.config.DEFAULT_CACHE_PATH", tmp_path)
+    monkeypatch.setattr("tokenlists.config.DEFAULT_TOKENLIST", "")
+    downloads = []
+
+    def install_tokenlist(self, uri):
+        downloads.append(uri)
+        if len(downloads) == 1:
+            raise ConnectionError("Offline")
+
+        self.installed_tokenlists["Remote"] = make_tokenlist("Remote", [DAI])
+        return "Remote"
+
+    monkeypatch.setattr(TokenListManager, "install_tokenlist", install_tokenlist)
+
+    manager = IndexedTokenListManager()
+    assert manager.install_required([ListInfo(name="Remote", uri="remote.uri")])[
+        "Remote"
+    ].exception()
+    assert manager._pending == {}
+
+    # NOTE: Error is only raised once, then the next lookup installs the list again
+    with pytest.raises(ConnectionError):
+        manager.get_tokenlist("Remote")
+
+    assert manager.get_index(1, "Remote").get_token_info("DAI") == DAI
+    assert downloads == ["remote.uri", "remote.uri"]
+
+
+def test_sees_lists_installed_by_other_managers(monkeypatch, tmp_path):
+    monkeypatch.setattr("tokenlists.config.DEFAULT_CACHE_PATH", tmp_path)
+    monkeypatch.setattr("tokenlists.config.DEFAULT_TOKENLIST", "")
+
+    def install_tokenlist(self, uri):
+        tokenlist = make_tokenlist("Remote", [DAI])
+        self.cache_folder.joinpath("Remote.json").write_text(tokenlist.model_dump_json())
+        self.installed_tokenlists["Remote"] = tokenlist
+        return "Remote"
+
+    monkeypatch.setattr(TokenListManager, "install_tokenlist", install_tokenlist)
+
+    # NOTE: e.g. a converter's manager, created before anything is installed
+    other_manager = IndexedTokenListManager()
+    with pytest.raises(ValueError):
+        other_manager.get_index(1)
+
+    manager = IndexedTokenListManager()
+    manager.install_required([ListInfo(name="Remote", uri="remote.uri")])
+    manager.set_default_tokenlist("Remote")
+    assert manager.get_index(1).get_token_info("DAI") == DAI
+
+    assert "Remote" in other_manager.installed_tokenlists
+    assert other_manager.get_index(1).get_token_info("DAI") == DAI
+
+
+def test_merged_index_priority(monkeypatch, tmp_path):
+    monkeypatch.setattr("tokenlists.config.DEFAULT_CACHE_PATH", tmp_path)
+    monkeypatch.setattr("tokenlists.config.DEFAULT_TOKENLIST", "")
+    bridged_usdc = USDC.model_copy(update=dict(address="0x" + "01" * 20))
+    bridged_dai = DAI.model_copy(update=dict(address="0x" + "02" * 20, symbol="dai"))
+
+    manager = IndexedTokenListManager()
+    # NOTE: Never written to the cache folder, so kept in memory
+    manager.installed_tokenlists["Main"] = make_tokenlist("Main", [USDC, DAI])
+    manager.installed_tokenlists["Bridged"] = make_tokenlist("Bridged", [bridged_usdc, bridged_dai])
+    manager.priority = ["Bridged", "Main"]
+
+    index = manager.get_index(1)
+    assert len(index) == 4
+    assert manager.get_index(1) is index  # NOTE: Built once
+
+    # NOTE: Higher priority list wins, even for case-insensitive matches
+    assert index.get_token_info("USDC") == bridged_usdc
+    assert index.get_token_info("DAI") == bridged_dai
+    # NOTE: Shadowed tokens are still available by address
+    assert index.get_token_info(USDC.address) == USDC
+
+    manager.priority = ["Main", "Bridged"]
+    assert manager.get_index(1).get_token_info("USDC") == USDC
+    assert manager.get_index(1, "Bridged").get_token_info("USDC") == bridged_usdc
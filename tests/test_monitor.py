@@ -0,0 +1,269 @@
+from decimal import Decimal
+
+import pytest
+from silverback.types import TaskType
+
+from ape_tokens import BalanceManager, Token
+
+
+@pytest.mark.parametrize(
+    "mode,num_subscriptions",
+    [("address", 4), ("token", 2)],
+)
+def test_monitor_transfers(mode, num_subscriptions, bot, owner, accounts, mock_token):
+    mock_token.mint(owner, 10**8, sender=owner)
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], mode=mode)
+    assert len(bot.handlers(TaskType.STARTUP)) == 1
+    assert len(bot.handlers(TaskType.EVENT_LOG)) == num_subscriptions
+
+    bot.startup()
+    assert balances[mock_token][owner] == Decimal(100)
+
+    tx = mock_token.transfer(accounts[1], 25 * 10**6, sender=owner)
+    (log,) = Token.Transfer.from_receipt(tx)
+
+    assert bot.process_log(log) == {
+        f"TEST/{owner.address}": Decimal(75),
+        f"TEST/{accounts[1].address}": Decimal(25),
+    }
+    assert balances[mock_token][owner] == Decimal(75)
+    assert balances[mock_token]._balances[owner.address] == 75 * 10**6  # NOTE: Stored raw
+
+    # NOTE: Neither party is watched
+    tx = mock_token.transfer(accounts[2], 10**6, sender=accounts[1])
+    mock_token.transfer(accounts[3], 10**6, sender=accounts[2])
+    (log,) = Token.Transfer.from_receipt(tx)
+    assert bot.process_log(log) == {f"TEST/{accounts[1].address}": Decimal(24)}
+
+    # Reorg: log is removed, so the transfer is reversed
+    bot.process_log(log.model_copy(update=dict(removed=True)))
+    assert balances[mock_token][accounts[1]] == Decimal(25)
+
+
+def test_monitor_unsupported_mode(bot, owner, mock_token):
+    with pytest.raises(ValueError):
+        BalanceManager(mock_token).monitor(bot, owner, mode="tokens")
+
+    with pytest.raises(ValueError):
+        BalanceManager(mock_token)[mock_token].monitor(bot, owner.address, mode="global")
+
+    # NOTE: Silverback can't filter one subscription by many token addresses
+    with pytest.raises(ValueError):
+        BalanceManager(mock_token).monitor(bot, owner, mode="global")
+
+
+@pytest.mark.parametrize("mode", ["address", "token"])
+def test_monitor_coalesced_metrics(mode, bot, chain, owner, accounts, mock_token):
+    mock_token.mint(owner, 10**8, sender=owner)
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], mode=mode, coalesce=True)
+    assert len(bot.handlers(TaskType.NEW_BLOCK)) == 2  # NOTE: Finalizing and metrics
+    bot.startup()
+
+    # NOTE: Pretend both transfers landed in the same block
+    logs = [
+        *Token.Transfer.from_receipt(mock_token.transfer(accounts[1], 10**6, sender=owner)),
+        *Token.Transfer.from_receipt(mock_token.transfer(accounts[1], 2 * 10**6, sender=owner)),
+    ]
+    block_number = logs[0].block_number
+    for log_index, log in enumerate(logs):
+        assert (
+            bot.process_log(
+                log.model_copy(update=dict(block_number=block_number, log_index=log_index))
+            )
+            == {}
+        )
+
+    # NOTE: Balances are still updated right away
+    assert balances[mock_token][accounts[1]] == Decimal(3)
+
+    # NOTE: Block is not complete yet
+    assert bot.process_block(chain.blocks[block_number]) == {}
+
+    assert bot.process_block(
+        chain.blocks.head.model_copy(update=dict(number=block_number + 1))
+    ) == {
+        f"TEST/{owner.address}": Decimal(97),
+        f"TEST/{accounts[1].address}": Decimal(3),
+    }
+    assert bot.process_block(chain.blocks.head) == {}  # NOTE: Only emitted once
+
+
+def test_monitor_reorgs(bot, chain, owner, accounts, mock_token):
+    mock_token.mint(owner, 10**8, sender=owner)
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], finality_depth=2)
+    bot.startup()
+    token_balances = balances[mock_token]
+
+    tx = mock_token.transfer(accounts[1], 10**6, sender=owner)
+    (log,) = Token.Transfer.from_receipt(tx)
+    bot.process_log(log)
+
+    # NOTE: Redelivered logs are only applied once
+    assert bot.process_log(log) == {}
+    assert token_balances[accounts[1]] == Decimal(1)
+
+    # NOTE: Removals are also only applied once
+    removed_log = log.model_copy(update=dict(removed=True))
+    bot.process_log(removed_log)
+    bot.process_log(removed_log)
+    assert token_balances[accounts[1]] == Decimal(0)
+    assert token_balances[owner] == Decimal(100)
+
+    bot.process_log(log)
+    assert len(token_balances._journals[owner.address]) == 1
+
+    # NOTE: Not final yet
+    bot.process_block(chain.blocks.head.model_copy(update=dict(number=log.block_number + 1)))
+    assert len(token_balances._journals[owner.address]) == 1
+
+    # NOTE: Final, so folded into the base balance
+    bot.process_block(chain.blocks.head.model_copy(update=dict(number=log.block_number + 2)))
+    assert len(token_balances._journals[owner.address]) == 0
+    assert token_balances[owner] == Decimal(99)
+
+    # NOTE: Reorg deeper than the finality depth can't be reversed, so the balance is reloaded
+    bot.process_log(removed_log)
+    assert token_balances._journals[owner.address].needs_reload
+    token_balances._balances[owner.address] = 0  # NOTE: Pretend it was corrupted
+    bot.process_block(chain.blocks.head)
+    assert token_balances[owner] == Decimal(99)
+    assert not token_balances._journals[owner.address].needs_reload
+
+
+def test_monitor_reconcile(bot, chain, owner, accounts, mock_token):
+    import asyncio
+
+    mock_token.mint(owner, 10**8, sender=owner)
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], reconcile="* * * * *", reconcile_budget=1)
+    (reconcile,) = bot.handlers(TaskType.CRON_JOB)
+    bot.startup()
+
+    # NOTE: Transfer log is never processed (e.g. like a rebasing token's balance change)
+    mock_token.transfer(accounts[1], 10**6, sender=owner)
+    chain.mine()  # NOTE: Balances are read 1 block behind the head
+
+    # NOTE: Only 1 balance per run, so `owner` first, then `accounts[1]`
+    assert asyncio.run(reconcile(None)) == {
+        f"TEST/{owner.address}/drift": Decimal(-1),
+        f"TEST/{owner.address}": Decimal(99),
+    }
+    assert balances[mock_token]._balances == {owner.address: 99 * 10**6, accounts[1].address: 0}
+
+    assert asyncio.run(reconcile(None)) == {
+        f"TEST/{accounts[1].address}/drift": Decimal(1),
+        f"TEST/{accounts[1].address}": Decimal(1),
+    }
+
+    # NOTE: Log of the head block is not processed yet, so must not be mistaken for drift
+    tx = mock_token.transfer(accounts[1], 10**6, sender=owner)
+    assert asyncio.run(reconcile(None)) == {}
+    assert asyncio.run(reconcile(None)) == {}
+
+    bot.process_log(*Token.Transfer.from_receipt(tx))
+    assert balances[mock_token]._balances == {
+        owner.address: 98 * 10**6,
+        accounts[1].address: 2 * 10**6,
+    }
+
+
+def test_monitor_checkpoint(monkeypatch, tmp_path, chain, owner, accounts, mock_token):
+    from ape_tokens.cache import BalanceCheckpointStore
+
+    from .conftest import StubBot
+
+    store = BalanceCheckpointStore(path=tmp_path / "balances.db")
+    # NOTE: Disabled on local networks by default
+    monkeypatch.setattr(BalanceCheckpointStore, "enabled", True)
+    monkeypatch.setattr("ape_tokens.managers.balance_checkpoints", store)
+
+    saves = []
+    save = store.save
+
+    def recording_save(chain_id, block_number, accounts, balances):
+        saves.append((block_number, list(balances)))
+        save(chain_id, block_number, accounts, saves[-1][1])
+
+    monkeypatch.setattr(store, "save", recording_save)
+
+    def checkpoint():
+        return store.get(chain.chain_id, mock_token.address)
+
+    mock_token.mint(owner, 10**8, sender=owner)
+    bot = StubBot()
+    BalanceManager(mock_token).monitor(bot, owner, accounts[1], checkpoint=True, finality_depth=2)
+    bot.startup()  # NOTE: Nothing checkpointed yet, so loads from chain
+
+    tx = mock_token.transfer(accounts[1], 10**6, sender=owner)
+    (log,) = Token.Transfer.from_receipt(tx)
+    bot.process_log(log)
+
+    # NOTE: Transfer is not final yet, so it is not part of the checkpoint
+    bot.process_block(chain.blocks.head.model_copy(update=dict(number=log.block_number + 1)))
+    assert checkpoint() == {
+        owner.address: (log.block_number - 1, 10**8),
+        accounts[1].address: (log.block_number - 1, 0),
+    }
+
+    bot.process_block(chain.blocks.head.model_copy(update=dict(number=log.block_number + 2)))
+    assert checkpoint() == {
+        owner.address: (log.block_number, 99 * 10**6),
+        accounts[1].address: (log.block_number, 10**6),
+    }
+
+    # NOTE: Only changed balances are written
+    bot.process_block(chain.blocks.head.model_copy(update=dict(number=log.block_number + 2)))
+    assert [len(balances) for _, balances in saves] == [2, 2, 0]
+
+    # NOTE: Bot is down while these happen
+    mock_token.transfer(accounts[1], 2 * 10**6, sender=owner)
+    mock_token.transfer(accounts[2], 10**6, sender=accounts[1])
+    mock_token.transfer(accounts[1], 10**6, sender=accounts[1])
+
+    # NOTE: Must restore from checkpoint, instead of reading balances from chain
+    monkeypatch.setattr("ape_tokens.managers.batch_call", None)
+    bot = StubBot()
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], checkpoint=True, finality_depth=2)
+    bot.startup()
+
+    assert balances[mock_token]._balances == {
+        owner.address: 97 * 10**6,
+        accounts[1].address: 2 * 10**6,
+    }
+
+    # NOTE: Another bot (sharing the store) only watches `owner`, so only it is checkpointed
+    head = chain.blocks.height
+    bot = StubBot()
+    BalanceManager(mock_token).monitor(bot, owner, checkpoint=True, finality_depth=2)
+    bot.startup()
+    bot.process_block(chain.blocks.head.model_copy(update=dict(number=head + 2)))
+    assert checkpoint() == {
+        owner.address: (head, 97 * 10**6),
+        accounts[1].address: (log.block_number, 10**6),
+    }
+
+    mock_token.transfer(accounts[1], 3 * 10**6, sender=owner)
+
+    loaded = []
+
+    def recording_batch_call(calls, block_id=None):
+        loaded.extend(args for _, args in calls)
+        return [mock_token.balanceOf(*args, block_id=block_id) for _, args in calls]
+
+    monkeypatch.setattr("ape_tokens.managers.batch_call", recording_batch_call)
+    bot = StubBot()
+    balances = BalanceManager(mock_token)
+    balances.monitor(bot, owner, accounts[1], accounts[2], checkpoint=True)
+    bot.startup()
+
+    # NOTE: Each account is replayed from its own checkpoint, and only new ones are loaded
+    assert loaded == [(accounts[2].address,)]
+    assert balances[mock_token]._balances == {
+        owner.address: 94 * 10**6,
+        accounts[1].address: 5 * 10**6,
+        accounts[2].address: 10**6,
+    }
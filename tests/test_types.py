@@ -0,0 +1,25 @@
+from tokenlists import TokenInfo
+
+from ape_tokens.types import TokenInstance
+
+
+def test_from_tokeninfo_without_proxy_detection(chain, owner, mock_token):
+    token_info = TokenInfo(
+        chainId=chain.chain_id,
+        address=mock_token.address,
+        name="Test token",
+        symbol="TEST",
+        decimals=6,
+    )
+
+    token = TokenInstance.from_tokeninfo(token_info, detect_proxy=False)
+    assert token.contract_type.name == "ERC20"
+    assert token._resolved_instance is None
+    assert token.symbol() == "TEST"
+    assert token.balanceOf(owner) == 0
+    assert token._resolved_instance is None  # NOTE: ERC20 methods don't need the full contract
+
+    # NOTE: Not in the ERC20 ABI, so resolves the full contract
+    token.mint(owner, 10**6, sender=owner)
+    assert token._resolved_instance is not None
+    assert token.balanceOf(owner) == 10**6